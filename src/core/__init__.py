@@ -3,9 +3,21 @@
 核心功能模块包
 """
 
-from .doc_processor import DocProcessor
-from .ai_connector import AIConnector
-from .format_manager import FormatManager
-from .structure_analyzer import StructureAnalyzer
+# 子模块按需导入，避免导入任一核心模块时连带加载python-docx、requests等全部依赖
+_LAZY_EXPORTS = {
+    'DocProcessor': '.doc_processor',
+    'AIConnector': '.ai_connector',
+    'FormatManager': '.format_manager',
+    'StructureAnalyzer': '.structure_analyzer',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        from importlib import import_module
+
+        return getattr(import_module(_LAZY_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = ['DocProcessor', 'AIConnector', 'FormatManager', 'StructureAnalyzer']
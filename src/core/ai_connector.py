@@ -4,8 +4,12 @@ AI接口连接器模块
 负责与AI API通信，发送请求和处理响应。
 """
 
+import hashlib
 import json
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 try:
     import json5
@@ -14,6 +18,14 @@ except ImportError:
 
 from ..utils.logger import app_logger
 
+# 连接阶段的超时（秒），主机不可达时尽快失败；读取超时仍使用配置中的timeout
+CONNECT_TIMEOUT = 5
+# 只有限流响应能确定服务端未处理请求，由连接池自动退避重试；
+# 502/503/504时上游可能已处理完请求（网关超时尤其如此），重发POST会重复计费
+RETRY_STATUS_CODES = (429,)
+# 验证成功结果的有效期（秒），过期后重新发送测试请求，已失效的Key能被及时发现
+VALIDATION_TTL = 600
+
 ALIGNMENT_ALIASES = {
     "left": "left",
     "center": "center",
@@ -40,6 +52,37 @@ class AIConnector:
         """
         初始化连接器
         
+        Args:
+            api_config: API配置信息，包含api_url, api_key, model, timeout等
+        """
+        # 最近一次验证成功的配置摘要及时间，只保存哈希，不在内存中额外保留API Key
+        self._validated_digest = None
+        self._validated_at = 0.0
+        
+        # 复用同一会话的连接池，验证请求与排版请求之间保持长连接，省去重复的TLS握手
+        self.session = requests.Session()
+        # 只重试连接失败与限流状态码；读取超时、响应中断或其他错误时请求可能已被服务端处理，
+        # 重发会重复计费并成倍延长等待，因此直接抛出
+        retry = Retry(
+            total=2,
+            read=False,
+            other=False,
+            backoff_factor=0.3,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset({"POST"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.update_config(api_config)
+        
+        app_logger.info(f"AI连接器初始化完成，使用模型: {self.model}，超时时间: {self.timeout}秒")
+    
+    def update_config(self, api_config):
+        """
+        更新API配置，保留已建立的HTTP会话
+        
         Args:
             api_config: API配置信息，包含api_url, api_key, model, timeout等
         """
@@ -48,13 +91,16 @@ class AIConnector:
         self.model = api_config.get("model", "deepseek-chat")
         # 设置超时时间，默认300秒（5分钟），可通过配置文件调整
         self.timeout = api_config.get("timeout", 300)
-        
-        app_logger.info(f"AI连接器初始化完成，使用模型: {self.model}，超时时间: {self.timeout}秒")
+        # (连接超时, 读取超时)
+        self.request_timeout = (min(CONNECT_TIMEOUT, self.timeout), self.timeout)
     
-    def validate_config(self):
+    def validate_config(self, force=False):
         """
         验证API配置是否有效
         
+        Args:
+            force: 是否忽略已缓存的验证结果，强制发送测试请求
+        
         Returns:
             (bool, str): 是否有效及错误信息
         """
@@ -67,21 +113,39 @@ class AIConnector:
         if not self.model:
             return False, "模型名称不能为空"
         
+        # 只缓存成功结果，失败可能是临时网络问题，下次仍需重新验证
+        config_digest = self._config_digest()
+        if (
+            not force
+            and config_digest == self._validated_digest
+            and time.monotonic() - self._validated_at < VALIDATION_TTL
+        ):
+            return True, "API配置验证成功"
+        
         # 尝试发送测试请求
         try:
             response = self._send_test_request()
             if response.status_code == 200:
                 app_logger.info("API配置验证成功")
+                self._validated_digest = config_digest
+                self._validated_at = time.monotonic()
                 return True, "API配置验证成功"
             else:
                 error_msg = f"API请求失败，状态码: {response.status_code}, 响应: {response.text}"
                 app_logger.error(error_msg)
+                self._validated_digest = None
                 return False, error_msg
         except Exception as e:
             error_msg = f"API请求异常: {str(e)}"
             app_logger.error(error_msg)
+            self._validated_digest = None
             return False, error_msg
     
+    def _config_digest(self):
+        """计算当前配置的摘要，用于判断该配置是否已验证过"""
+        raw = "\0".join((self.api_url, self.api_key, self.model))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    
     def _send_test_request(self):
         """
         发送测试请求以验证API配置
@@ -103,7 +167,7 @@ class AIConnector:
             "stream": False
         }
         
-        return requests.post(self.api_url, headers=headers, json=data, timeout=self.timeout)
+        return self.session.post(self.api_url, headers=headers, json=data, timeout=self.request_timeout)
     
     def generate_prompt(self, document_content, formatting_rules):
         """
@@ -250,7 +314,7 @@ class AIConnector:
         try:
             app_logger.info(f"开始发送请求，超时时间设置为{self.timeout}秒")
             # 使用配置的超时时间，给API更多处理时间
-            response = requests.post(self.api_url, headers=headers, json=data, timeout=self.timeout)
+            response = self.session.post(self.api_url, headers=headers, json=data, timeout=self.request_timeout)
             
             # 记录响应状态和时间
             app_logger.info(f"收到响应，状态码: {response.status_code}")
@@ -12,13 +12,20 @@ from docx.enum.text import WD_PARAGRAPH_ALIGNMENT, WD_LINE_SPACING
 from docx.oxml.ns import qn
 from ..utils.logger import app_logger
 from ..utils.file_utils import generate_output_filename, is_valid_docx, backup_file
-from ..utils.font_manager import FontManager
+from ..utils.font_manager import FONT_SIZE_MAPPING, FontManager
 from .header_footer_processor import HeaderFooterProcessor
 from .header_footer_config import HeaderFooterConfig
 
 class DocProcessor:
     """文档处理器，负责读取、解析和写入Word文档"""
     
+    # 字号映射与具体文档无关，定义为类常量，每次运行新建处理器时无需重建；
+    # 排版只应用小二至六号，磅值取自共享字号表，其余字号保持文档原样
+    font_size_mapping = {
+        name: FONT_SIZE_MAPPING[name]
+        for name in ("小二", "三号", "小三", "四号", "小四", "五号", "小五", "六号")
+    }
+    
     def __init__(self):
         """初始化文档处理器"""
         self.document = None
@@ -32,18 +39,6 @@ class DocProcessor:
         # 初始化页眉页脚处理器
         self.header_footer_processor = HeaderFooterProcessor()
         
-        # 字号映射
-        self.font_size_mapping = {
-            "小二": Pt(18),
-            "三号": Pt(16),
-            "小三": Pt(15),
-            "四号": Pt(14),
-            "小四": Pt(12),
-            "五号": Pt(10.5),
-            "小五": Pt(9),
-            "六号": Pt(7.5)
-        }
-        
         app_logger.debug(f"文档处理器初始化完成，字号映射: {list(self.font_size_mapping.keys())}")
     
     def read_document(self, file_path):
@@ -85,7 +80,7 @@ class DocProcessor:
         
         return self.paragraphs_text
     
-    def apply_formatting(self, formatting_instructions, custom_save_path=None, header_footer_config=None):
+    def apply_formatting(self, formatting_instructions, custom_save_path=None, header_footer_config=None, progress_callback=None):
         """
         根据排版指令应用格式
         
@@ -93,6 +88,7 @@ class DocProcessor:
             formatting_instructions: 排版指令，包含元素类型和格式信息
             custom_save_path: 自定义保存路径，如果指定则使用该路径
             header_footer_config: 页眉页脚配置，HeaderFooterConfig对象
+            progress_callback: 进度回调，每处理完一批元素以(已处理数, 总数)调用一次
             
         Returns:
             是否成功应用格式
@@ -167,7 +163,6 @@ class DocProcessor:
                 for i in range(batch_start, batch_end):
                     element = elements[i]
                     try:
-                        app_logger.debug(f"处理第 {i+1}/{total_elements} 个元素")
                         processed = self._process_element(new_doc, element)
                         if processed:
                             report["processed_elements"] += 1
@@ -186,7 +181,8 @@ class DocProcessor:
                         })
                         # 继续处理下一个元素，不中断整个过程
 
-                app_logger.debug(f"批次 {batch_start+1}-{batch_end} 处理完成")
+                if progress_callback:
+                    progress_callback(batch_end, total_elements)
             
             # 生成输出文件名
             try:
@@ -259,22 +255,14 @@ class DocProcessor:
         run = None
         
         try:
-            # 记录当前处理的元素信息
-            app_logger.debug(f"开始处理元素: {element}")
-            
             # 检查元素结构
             if not isinstance(element, dict):
                 app_logger.error(f"元素不是字典类型: {type(element)}")
                 return False
             
             content = element.get('content', '')
-            app_logger.debug(f"元素内容: {content[:50]}...")
-            
             element_type = element.get('type', '正文')
-            app_logger.debug(f"元素类型: {element_type}")
-            
             format_info = element.get('format', {})
-            app_logger.debug(f"格式信息: {format_info}")
             
             # 检查format_info结构
             if not isinstance(format_info, dict):
@@ -283,19 +271,15 @@ class DocProcessor:
             
             # 添加段落
             paragraph = doc.add_paragraph()
-            app_logger.debug("成功添加段落")
-            
             run = paragraph.add_run(content)
-            app_logger.debug("成功添加文本运行")
             
             # 应用字体
             self._apply_font(run, format_info)
-            app_logger.debug("成功应用字体格式")
             
             # 应用段落格式
             self._apply_paragraph_format(paragraph, format_info, element_type)
-            app_logger.debug("成功应用段落格式")
             
+            # 每个元素只记录一条简短的汇总日志，不格式化整个格式字典，避免大文档产生大量日志
             app_logger.debug(f"完成元素处理: {element_type}, 内容: {content[:20]}...")
             return True
 
@@ -315,70 +299,60 @@ class DocProcessor:
             run: 文本运行对象
             format_info: 格式信息
         """
-        if not run or not hasattr(run, 'font'):
+        # run.font每次访问都会新建Font对象，校验时取一次，后续直接复用
+        font = getattr(run, 'font', None) if run else None
+        if font is None:
             app_logger.error("无效的文本运行对象")
             return
             
         try:
             # 字体名称 - 使用安全的默认值
             font_name = format_info.get('font', '宋体') if format_info else '宋体'
-            app_logger.debug(f"原始字体名称: {font_name}")
             
             # 简化字体处理，避免复杂的映射操作
             safe_fonts = {'宋体': 'SimSun', '黑体': 'SimHei', '楷体': 'KaiTi', '仿宋': 'FangSong'}
             document_font = safe_fonts.get(font_name, font_name)
-            app_logger.debug(f"用于文档的字体名称: {document_font}")
             
             # 安全设置字体名称
             try:
-                if hasattr(run.font, 'name'):
-                    run.font.name = document_font
+                font.name = document_font
             except Exception as e:
                 app_logger.error(f"设置字体名称失败: {str(e)}")
             
             # 简化中文字体设置，避免直接操作XML元素
             try:
-                if hasattr(run, '_element') and hasattr(run._element, 'rPr'):
-                    run._element.rPr.rFonts.set(qn('w:eastAsia'), document_font)
-                    app_logger.debug(f"成功设置中文字体: {document_font}")
+                rPr = run._element.rPr
+                if rPr is not None:
+                    rPr.rFonts.set(qn('w:eastAsia'), document_font)
             except Exception as e:
                 app_logger.debug(f"设置中文字体失败，使用默认设置: {str(e)}")
                 
             # 字体大小 - 使用安全的默认值
             font_size = format_info.get('size', '小四') if format_info else '小四'
-            app_logger.debug(f"原始字体大小: {font_size}")
             
             try:
                 if isinstance(font_size, str) and font_size in self.font_size_mapping:
                     mapped_size = self.font_size_mapping[font_size]
-                    app_logger.debug(f"映射后的字体大小: {mapped_size}")
-                    if hasattr(run.font, 'size'):
-                        run.font.size = mapped_size
+                    font.size = mapped_size
             except Exception as e:
                 app_logger.error(f"设置字体大小失败: {str(e)}")
             
             # 安全设置字体属性
             try:
                 bold = format_info.get('bold', False) if format_info else False
-                if hasattr(run, 'bold'):
-                    run.bold = bold
-                    app_logger.debug(f"设置粗体: {bold}")
+                run.bold = bold
             except Exception as e:
                 app_logger.error(f"设置粗体失败: {str(e)}")
             
             try:
                 italic = format_info.get('italic', False) if format_info else False
-                if hasattr(run, 'italic'):
-                    run.italic = italic
-                    app_logger.debug(f"设置斜体: {italic}")
+                run.italic = italic
             except Exception as e:
                 app_logger.error(f"设置斜体失败: {str(e)}")
             
             try:
                 underline = format_info.get('underline', False) if format_info else False
-                if hasattr(run, 'underline'):
-                    run.underline = underline
-                    app_logger.debug(f"设置下划线: {underline}")
+                run.underline = underline
             except Exception as e:
                 app_logger.error(f"设置下划线失败: {str(e)}")
             
@@ -397,7 +371,9 @@ class DocProcessor:
             format_info: 格式信息
             element_type: 元素类型
         """
-        if not paragraph or not hasattr(paragraph, 'paragraph_format'):
+        # paragraph_format每次访问都会新建对象，校验时取一次，后续直接复用
+        paragraph_format = getattr(paragraph, 'paragraph_format', None) if paragraph else None
+        if paragraph_format is None:
             app_logger.error("无效的段落对象")
             return
             
@@ -408,72 +384,58 @@ class DocProcessor:
             
             # 行间距 - 使用更安全的默认值
             line_spacing = format_info.get('line_spacing', 1.5)
-            app_logger.debug(f"设置行间距: {line_spacing}")
             
             try:
-                if isinstance(line_spacing, (int, float)) and hasattr(paragraph, 'paragraph_format'):
+                if isinstance(line_spacing, (int, float)):
                     # 防止异常大的行间距值导致程序崩溃
                     if line_spacing > 3.0 or line_spacing < 0.8:
                         app_logger.warning(f"检测到异常行间距值: {line_spacing}，将使用默认值1.5")
                         line_spacing = 1.5
                     
                     if abs(line_spacing - 1.0) < 0.1:
-                        paragraph.paragraph_format.line_spacing_rule = WD_LINE_SPACING.SINGLE
-                        app_logger.debug("设置单倍行间距")
+                        paragraph_format.line_spacing_rule = WD_LINE_SPACING.SINGLE
                     elif abs(line_spacing - 1.5) < 0.1:
-                        paragraph.paragraph_format.line_spacing_rule = WD_LINE_SPACING.ONE_POINT_FIVE
-                        app_logger.debug("设置1.5倍行间距")
+                        paragraph_format.line_spacing_rule = WD_LINE_SPACING.ONE_POINT_FIVE
                     elif abs(line_spacing - 2.0) < 0.1:
-                        paragraph.paragraph_format.line_spacing_rule = WD_LINE_SPACING.DOUBLE
-                        app_logger.debug("设置双倍行间距")
+                        paragraph_format.line_spacing_rule = WD_LINE_SPACING.DOUBLE
                     else:
                         # 使用默认1.5倍行间距，避免复杂设置
-                        paragraph.paragraph_format.line_spacing_rule = WD_LINE_SPACING.ONE_POINT_FIVE
-                        app_logger.debug("使用默认1.5倍行间距")
+                        paragraph_format.line_spacing_rule = WD_LINE_SPACING.ONE_POINT_FIVE
             except Exception as e:
                 app_logger.error(f"设置行间距失败: {str(e)}")
             
             # 对齐方式 - 简化处理
             try:
                 alignment = format_info.get('alignment', 'left')
-                app_logger.debug(f"设置对齐方式: {alignment}")
                 
-                if hasattr(paragraph, 'alignment'):
-                    if alignment == 'center':
-                        paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-                    elif alignment == 'right':
-                        paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.RIGHT
-                    elif alignment == 'justify':
-                        paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.JUSTIFY
-                    else:  # 默认左对齐
-                        paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.LEFT
+                if alignment == 'center':
+                    paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+                elif alignment == 'right':
+                    paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.RIGHT
+                elif alignment == 'justify':
+                    paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.JUSTIFY
+                else:  # 默认左对齐
+                    paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.LEFT
             except Exception as e:
                 app_logger.error(f"设置对齐方式失败: {str(e)}")
             
             # 首行缩进 - 简化处理
             try:
-                if hasattr(paragraph, 'paragraph_format') and hasattr(paragraph.paragraph_format, 'first_line_indent'):
-                    first_line_indent = format_info.get('first_line_indent', None)
-                    
-                    if first_line_indent is not None and isinstance(first_line_indent, (int, float)):
-                        if 0 <= first_line_indent <= 50:  # 限制缩进范围
-                            paragraph.paragraph_format.first_line_indent = Pt(first_line_indent)
-                            app_logger.debug(f"设置首行缩进: {first_line_indent}磅")
-                    elif element_type == '正文':  # 正文默认缩进
-                        paragraph.paragraph_format.first_line_indent = Pt(21)
-                        app_logger.debug("设置正文默认首行缩进: 21磅")
+                first_line_indent = format_info.get('first_line_indent', None)
+                
+                if first_line_indent is not None and isinstance(first_line_indent, (int, float)):
+                    if 0 <= first_line_indent <= 50:  # 限制缩进范围
+                        paragraph_format.first_line_indent = Pt(first_line_indent)
+                elif element_type == '正文':  # 正文默认缩进
+                    paragraph_format.first_line_indent = Pt(21)
             except Exception as e:
                 app_logger.error(f"设置首行缩进失败: {str(e)}")
             
             # 段间距 - 简化处理，避免复杂设置
             try:
-                if hasattr(paragraph, 'paragraph_format'):
-                    # 使用固定的安全间距值
-                    if hasattr(paragraph.paragraph_format, 'space_before'):
-                        paragraph.paragraph_format.space_before = Pt(0)
-                    if hasattr(paragraph.paragraph_format, 'space_after'):
-                        paragraph.paragraph_format.space_after = Pt(0)
-                    app_logger.debug("设置段间距为0")
+                # 使用固定的安全间距值
+                paragraph_format.space_before = Pt(0)
+                paragraph_format.space_after = Pt(0)
             except Exception as e:
                 app_logger.error(f"设置段间距失败: {str(e)}")
                 
@@ -9,10 +9,14 @@ import json
 import json5
 from docx.shared import Pt
 from ..utils.logger import app_logger
+from ..utils.font_manager import FONT_SIZE_MAPPING
 
 class FormatManager:
     """排版规则管理器，负责管理和应用排版规则"""
     
+    # 字体大小映射表（模块级共享常量）
+    font_size_mapping = FONT_SIZE_MAPPING
+    
     def __init__(self, templates_dir="config/templates"):
         """
         初始化排版规则管理器
@@ -22,28 +26,12 @@ class FormatManager:
         """
         self.templates_dir = templates_dir
         self.templates = {}
+        self._template_names = None
+        # 模板文件解析缓存：文件名 -> (mtime_ns, 文件大小, 模板内容)，刷新时只重新解析有变化的文件
+        self._template_file_cache = {}
         self.current_template = None
         self.current_template_name = ""
         
-        # 字体大小映射表
-        self.font_size_mapping = {
-            "初号": Pt(42),
-            "小初": Pt(36),
-            "一号": Pt(26),
-            "小一": Pt(24),
-            "二号": Pt(22),
-            "小二": Pt(18),
-            "三号": Pt(16),
-            "小三": Pt(15),
-            "四号": Pt(14),
-            "小四": Pt(12),
-            "五号": Pt(10.5),
-            "小五": Pt(9),
-            "六号": Pt(7.5),
-            "小六": Pt(6.5),
-            "七号": Pt(5.5),
-            "八号": Pt(5)
-        }
         
         # 加载模板
         self.load_templates()
@@ -58,23 +46,36 @@ class FormatManager:
             dict: 模板字典，键为模板名称，值为模板内容
         """
         self.templates = {}
+        self._template_names = None
         
         if not os.path.exists(self.templates_dir):
             app_logger.warning(f"模板目录不存在: {self.templates_dir}")
             return self.templates
         
-        for filename in os.listdir(self.templates_dir):
-            if filename.endswith('.json'):
-                template_path = os.path.join(self.templates_dir, filename)
+        file_cache = {}
+        with os.scandir(self.templates_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.json'):
+                    continue
+                template_path = entry.path
                 try:
-                    with open(template_path, 'r', encoding='utf-8') as f:
-                        template = json5.loads(f.read())
-                        template_name = template.get('name', os.path.splitext(filename)[0])
-                        self.templates[template_name] = template
-                        app_logger.debug(f"加载模板: {template_name}")
+                    stat = entry.stat()
+                    signature = (stat.st_mtime_ns, stat.st_size)
+                    cached = self._template_file_cache.get(entry.name)
+                    if cached is not None and cached[:2] == signature:
+                        template = cached[2]
+                    else:
+                        with open(template_path, 'r', encoding='utf-8') as f:
+                            template = json5.loads(f.read())
+                        app_logger.debug(f"加载模板: {template.get('name', entry.name)}")
+                    file_cache[entry.name] = signature + (template,)
+                    template_name = template.get('name', os.path.splitext(entry.name)[0])
+                    self.templates[template_name] = template
                 except Exception as e:
                     app_logger.error(f"加载模板失败: {template_path}, 错误: {str(e)}")
         
+        # 只保留仍存在的文件，已删除的模板不会残留在缓存中
+        self._template_file_cache = file_cache
         return self.templates
     
     def get_templates(self):
@@ -91,9 +92,12 @@ class FormatManager:
         获取所有模板名称
         
         Returns:
-            list: 模板名称列表
+            list: 按名称排序的模板名称列表
         """
-        return list(self.templates.keys())
+        # 排序结果在模板集合变化前一直复用，避免目录遍历顺序导致下拉框顺序不稳定
+        if self._template_names is None:
+            self._template_names = sorted(self.templates)
+        return list(self._template_names)
     
     def get_template(self, template_name):
         """
@@ -152,6 +156,7 @@ class FormatManager:
         
         # 更新内存中的模板
         self.templates[template_name] = template_content
+        self._template_names = None
         
         # 保存到文件
         # 记录保存路径信息，方便调试
@@ -164,13 +169,24 @@ class FormatManager:
                 os.makedirs(self.templates_dir)
                 app_logger.debug(f"创建模板目录: {self.templates_dir}")
             
+            serialized = json.dumps(template_content, ensure_ascii=False, indent=4)
+
+            # 内容未变化时跳过重写（重复保存同一模板很常见）
+            try:
+                with open(template_file, 'r', encoding='utf-8') as f:
+                    if f.read() == serialized:
+                        app_logger.debug(f"模板内容未变化，跳过写入: {template_name}")
+                        return True
+            except FileNotFoundError:
+                pass
+
             # 先删除同名模板文件（如果存在）
             if os.path.exists(template_file):
                 os.remove(template_file)
                 app_logger.debug(f"删除原模板文件: {template_file}")
             
             with open(template_file, 'w', encoding='utf-8') as f:
-                json.dump(template_content, f, ensure_ascii=False, indent=4)
+                f.write(serialized)
                 app_logger.info(f"保存模板: {template_name}")
                 
                 # 验证文件是否写入成功
@@ -200,6 +216,7 @@ class FormatManager:
         
         # 从内存中删除
         del self.templates[template_name]
+        self._template_names = None
         
         # 从文件系统中删除
         template_file = os.path.join(self.templates_dir, f"{template_name}.json")
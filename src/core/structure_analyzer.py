@@ -12,39 +12,40 @@ class StructureAnalyzer:
 
     # 中文标点常量（用于标题检测）
     CHINESE_PUNCTUATION = '.!?;,\u3002\u3001\uff01\uff1f\uff1b\uff0c'
+    # 标点集合，用isdisjoint一次判断段落中是否含有任一标点
+    _PUNCTUATION_SET = frozenset(CHINESE_PUNCTUATION)
 
-    def __init__(self):
-        """初始化文档结构分析器"""
-        # 标题关键词列表
-        self.title_keywords = [
-            "标题", "题目", "标题：", "题目：", "title", "subject"
-        ]
+    # 以下关键词与模式不随实例变化，定义为类常量，模块导入时只构建一次
+    # 标题关键词列表
+    TITLE_KEYWORDS = (
+        "标题", "题目", "标题：", "题目：", "title", "subject"
+    )
 
-        # 摘要关键词列表
-        self.abstract_keywords = [
-            "摘要", "摘 要", "摘要：", "abstract", "summary"
-        ]
+    # 摘要关键词列表
+    ABSTRACT_KEYWORDS = (
+        "摘要", "摘 要", "摘要：", "abstract", "summary"
+    )
 
-        # 关键词关键词列表
-        self.keywords_keywords = [
-            "关键词", "关键词：", "关 键 词", "keywords", "key words"
-        ]
+    # 关键词关键词列表
+    KEYWORDS_KEYWORDS = (
+        "关键词", "关键词：", "关 键 词", "keywords", "key words"
+    )
 
-        # 参考文献关键词列表
-        self.references_keywords = [
-            "参考文献", "参考文献：", "引用文献", "references", "bibliography"
-        ]
+    # 参考文献关键词列表
+    REFERENCES_KEYWORDS = (
+        "参考文献", "参考文献：", "引用文献", "references", "bibliography"
+    )
 
-        # 数字标题模式（预编译正则表达式）
-        self.numeric_title_patterns = [
-            re.compile(r'^\d+\.\s+.+'),  # 1. 标题
-            re.compile(r'^\d+\.\d+\.\s+.+'),  # 1.1. 标题
-            re.compile(r'^\d+\.\d+\.\d+\.\s+.+'),  # 1.1.1. 标题
-            re.compile(r'^[\u4e00-\u9fa5]+\s*[\u3001\uff0c\uff1a]\s*.+'),  # 一、标题
-            re.compile(r'^\(\d+\)\s+.+'),  # (1) 标题
-            re.compile(r'^[A-Z]\.\s+.+'),  # A. 标题
-            re.compile(r'^[a-z]\.\s+.+')   # a. 标题
-        ]
+    # 数字标题模式（预编译正则表达式）
+    NUMERIC_TITLE_PATTERNS = (
+        re.compile(r'^\d+\.\s+.+'),  # 1. 标题
+        re.compile(r'^\d+\.\d+\.\s+.+'),  # 1.1. 标题
+        re.compile(r'^\d+\.\d+\.\d+\.\s+.+'),  # 1.1.1. 标题
+        re.compile(r'^[\u4e00-\u9fa5]+\s*[\u3001\uff0c\uff1a]\s*.+'),  # 一、标题
+        re.compile(r'^\(\d+\)\s+.+'),  # (1) 标题
+        re.compile(r'^[A-Z]\.\s+.+'),  # A. 标题
+        re.compile(r'^[a-z]\.\s+.+')   # a. 标题
+    )
     
     def analyze_text_features(self, paragraphs):
         """
@@ -72,6 +73,7 @@ class StructureAnalyzer:
         
         # 计算段落长度统计信息
         total_length = 0
+        total_paragraphs = len(paragraphs)
         for i, para in enumerate(paragraphs):
             if not para.strip():  # 跳过空段落
                 continue
@@ -84,11 +86,11 @@ class StructureAnalyzer:
             features['min_length'] = min(features['min_length'], length)
             
             # 检测潜在的标题
-            if self._is_potential_title(para, i, len(paragraphs)):
+            if self._is_potential_title(para, i, total_paragraphs):
                 features['potential_titles'].append(i)
             
             # 检测潜在的小标题
-            elif self._is_potential_subtitle(para, i, len(paragraphs)):
+            elif self._is_potential_subtitle(para, i, total_paragraphs):
                 features['potential_subtitles'].append(i)
             
             # 检测特殊部分
@@ -122,12 +124,13 @@ class StructureAnalyzer:
             return True
         
         # 包含标题关键词
-        for keyword in self.title_keywords:
-            if keyword in paragraph.lower():
+        para_lower = paragraph.lower()
+        for keyword in self.TITLE_KEYWORDS:
+            if keyword in para_lower:
                 return True
         
         # 没有标点符号的短段落可能是标题
-        if len(paragraph) < 20 and not any(p in paragraph for p in self.CHINESE_PUNCTUATION):
+        if len(paragraph) < 20 and self._PUNCTUATION_SET.isdisjoint(paragraph):
             return True
         
         return False
@@ -145,14 +148,14 @@ class StructureAnalyzer:
             bool: 是否可能是小标题
         """
         # 检查是否符合数字标题模式
-        for pattern in self.numeric_title_patterns:
-            if re.match(pattern, paragraph):
+        for pattern in self.NUMERIC_TITLE_PATTERNS:
+            if pattern.match(paragraph):
                 return True
         
         # 短段落且下一段不为空
         if len(paragraph) < 30 and index < total_paragraphs - 1:
             # 没有标点符号的短段落可能是小标题
-            if not any(p in paragraph for p in self.CHINESE_PUNCTUATION):
+            if self._PUNCTUATION_SET.isdisjoint(paragraph):
                 return True
         
         return False
@@ -169,19 +172,19 @@ class StructureAnalyzer:
         para_lower = paragraph.lower()
         
         # 检测摘要
-        for keyword in self.abstract_keywords:
+        for keyword in self.ABSTRACT_KEYWORDS:
             if keyword in para_lower:
                 features['special_sections']['abstract'] = index
                 return
         
         # 检测关键词
-        for keyword in self.keywords_keywords:
+        for keyword in self.KEYWORDS_KEYWORDS:
             if keyword in para_lower:
                 features['special_sections']['keywords'] = index
                 return
         
         # 检测参考文献
-        for keyword in self.references_keywords:
+        for keyword in self.REFERENCES_KEYWORDS:
             if keyword in para_lower:
                 features['special_sections']['references'] = index
                 return
@@ -214,9 +217,11 @@ class StructureAnalyzer:
             abstract_start = features['special_sections']['abstract']
             abstract_end = abstract_start
             
-            # 尝试确定摘要结束位置
+            # 尝试确定摘要结束位置（标题索引转为集合，避免循环内的列表查找）
+            heading_indexes = set(features.get('potential_titles', []))
+            heading_indexes.update(features.get('potential_subtitles', []))
             for i in range(abstract_start + 1, len(features.get('paragraph_lengths', []))):
-                if i in features.get('potential_titles', []) or i in features.get('potential_subtitles', []):
+                if i in heading_indexes:
                     abstract_end = i - 1
                     break
                 if 'keywords' in features.get('special_sections', {}) and i == features['special_sections']['keywords']:
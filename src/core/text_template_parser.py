@@ -7,10 +7,14 @@
 import re
 import json
 from ..utils.logger import app_logger
+from ..utils.font_manager import FONT_SIZE_MAPPING
 
 class TextTemplateParser:
     """文本模板解析器，负责解析格式要求文本并生成模板"""
     
+    # 支持的字号（模块级共享常量，只用于校验字号名称）
+    font_size_mapping = FONT_SIZE_MAPPING
+    
     def __init__(self, ai_connector):
         """
         初始化文本模板解析器
@@ -20,25 +24,6 @@ class TextTemplateParser:
         """
         self.ai_connector = ai_connector
         
-        # 字号映射表
-        self.font_size_mapping = {
-            "初号": "初号",
-            "小初": "小初", 
-            "一号": "一号",
-            "小一": "小一",
-            "二号": "二号",
-            "小二": "小二",
-            "三号": "三号",
-            "小三": "小三",
-            "四号": "四号",
-            "小四": "小四",
-            "五号": "五号",
-            "小五": "小五",
-            "六号": "六号",
-            "小六": "小六",
-            "七号": "七号",
-            "八号": "八号"
-        }
         
         # 对齐方式映射
         self.alignment_mapping = {
@@ -10,6 +10,7 @@ from .contracts import (
     StageRecord,
 )
 from .events import CallbackEventSink, NullEventSink
+from .response_cache import OutputCache, ResponseCache
 from .run_store import RunStore
 from .template_rules import normalize_alignment, normalize_template_rules
 
@@ -26,6 +27,8 @@ __all__ = [
     "DocumentFormatRequest",
     "DocumentFormatResult",
     "NullEventSink",
+    "OutputCache",
+    "ResponseCache",
     "RuntimeEvalHarness",
     "RunStage",
     "RunStatus",
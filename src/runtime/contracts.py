@@ -17,6 +17,9 @@ class RunStage(str, Enum):
     AI_RESPONSE_RECEIVED = "AI_RESPONSE_RECEIVED"
     PLAN_VALIDATED = "PLAN_VALIDATED"
     HEADER_FOOTER_VALIDATED = "HEADER_FOOTER_VALIDATED"
+    # Live-only progress events streamed while the document is rendered;
+    # not recorded in stage_history or events.jsonl.
+    DOCUMENT_RENDERING = "DOCUMENT_RENDERING"
     DOCUMENT_RENDERED = "DOCUMENT_RENDERED"
     OUTPUT_READY = "OUTPUT_READY"
     COMPLETED = "COMPLETED"
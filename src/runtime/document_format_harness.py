@@ -1,8 +1,11 @@
 # -*- coding: utf-8 -*-
 """Synchronous runtime harness for document formatting."""
 
+import atexit
 import json
 import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timezone
 from hashlib import sha256
 from pathlib import Path
@@ -27,6 +30,20 @@ from src.runtime.run_store import RunStore
 from src.runtime.template_rules import normalize_template_rules
 
 
+# Documents shorter than this skip local structure analysis; the AI infers
+# structure for them directly.
+STRUCTURE_ANALYSIS_MIN_CHARS = 2000
+
+# Minimum seconds between two render progress events; the final batch is
+# always reported.
+RENDER_PROGRESS_MIN_INTERVAL = 0.1
+
+# Shared across runs so concurrent sessions reuse worker threads instead of
+# creating and tearing down an executor per document.
+_VALIDATION_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="api-validation")
+atexit.register(_VALIDATION_EXECUTOR.shutdown)
+
+
 class HarnessFailure(Exception):
     """Internal exception carrying a typed, sanitized runtime failure."""
 
@@ -47,12 +64,24 @@ class DocumentFormatHarness:
         doc_processor_factory=None,
         ai_connector_factory=None,
         structure_analyzer=None,
+        response_cache=None,
+        output_cache=None,
     ):
         self.run_store = RunStore(base_dir=runtime_dir)
-        self.format_manager = format_manager or FormatManager()
+        # Built on first use: runs that arrive with template_rules never need
+        # the template directory scan FormatManager() performs.
+        self._format_manager = format_manager
         self.doc_processor_factory = doc_processor_factory or DocProcessor
         self.ai_connector_factory = ai_connector_factory or AIConnector
         self.structure_analyzer = structure_analyzer or StructureAnalyzer()
+        self.response_cache = response_cache
+        self.output_cache = output_cache
+
+    @property
+    def format_manager(self):
+        if self._format_manager is None:
+            self._format_manager = FormatManager()
+        return self._format_manager
 
     def run(
         self,
@@ -81,31 +110,130 @@ class DocumentFormatHarness:
         stage_history = []
         warnings = []
         instruction_count = 0
+        # Events are buffered and appended to events.jsonl in batches, flushed
+        # before each long-running phase so a killed process still leaves the
+        # stages it reached on disk.
+        pending_events = []
+        validation_future = None
 
         def iso_now():
             return datetime.now(timezone.utc).isoformat()
 
+        def flush_events():
+            if pending_events:
+                self.run_store.append_events(run_dir, pending_events)
+                pending_events.clear()
+
         def emit(stage, status, message=None, **extra):
+            # Take one timestamp per event so the stage record and the event agree
+            now = iso_now()
             record = StageRecord(
                 stage=stage,
                 status=status,
-                started_at=iso_now(),
-                ended_at=iso_now(),
+                started_at=now,
+                ended_at=now,
                 message=message,
             )
             stage_history.append(record)
             payload = {
-                "timestamp": iso_now(),
+                "timestamp": now,
                 "stage": stage.value,
                 "status": status.value,
                 "message": message,
             }
             payload.update(extra)
             event_sink.emit(payload)
-            self.run_store.append_event(run_dir, payload)
+            pending_events.append(payload)
 
         try:
             emit(RunStage.INIT, RunStatus.RUNNING, "run initialized")
+            # Template and header/footer checks are local, so run them before staging,
+            # API validation and the AI request and fail fast on bad config; the
+            # matching stage events are still emitted in their usual order
+            if request.template_rules is not None:
+                template_rules = normalize_template_rules(request.template_rules)
+            else:
+                template = self.format_manager.get_template(request.template_name)
+                if not template:
+                    raise HarnessFailure(RuntimeErrorCode.TEMPLATE_NOT_FOUND, "template not found")
+                template_rules = normalize_template_rules(template.get("rules", {}))
+
+            hf_config = HeaderFooterConfig.from_dict(request.header_footer_config)
+            is_valid_hf, hf_error = hf_config.validate()
+            if not is_valid_hf:
+                raise HarnessFailure(
+                    RuntimeErrorCode.HEADER_FOOTER_INVALID,
+                    self._sanitize_error_message(RuntimeErrorCode.HEADER_FOOTER_INVALID, hf_error),
+                )
+
+            ai_connector = self.ai_connector_factory(request.api_config)
+
+            # An identical earlier run skips reading, the AI request and
+            # rendering, but the API config is still validated and the run is
+            # still recorded in the run store.
+            output_key = None
+            if self.output_cache is not None:
+                output_key = self.output_cache.make_key(
+                    request.source_bytes,
+                    template_rules,
+                    request.api_config,
+                    request.header_footer_config,
+                    request.language,
+                )
+                output_bytes = self.output_cache.get(output_key)
+                if output_bytes is not None:
+                    valid, error_msg = ai_connector.validate_config()
+                    if not valid:
+                        raise HarnessFailure(
+                            RuntimeErrorCode.INVALID_API_CONFIG,
+                            self._sanitize_error_message(RuntimeErrorCode.INVALID_API_CONFIG, error_msg),
+                        )
+                    emit(RunStage.API_VALIDATED, RunStatus.RUNNING, "api validated")
+                    emit(RunStage.OUTPUT_READY, RunStatus.RUNNING, "output reused from cache", cached=True)
+                    self.run_store.write_manifest(
+                        run_dir,
+                        {
+                            "schema_version": "formulaai.run.v1",
+                            "run_id": run_id,
+                            "created_at": stage_history[0].started_at,
+                            "completed_at": iso_now(),
+                            "status": "success",
+                            "entrypoint": "web_app.process_document",
+                            "input": {
+                                "kind": "docx",
+                                "name_hash": "sha256:" + sha256(request.source_name.encode("utf-8")).hexdigest(),
+                                "size_bytes": len(request.source_bytes),
+                                "sha256": "sha256:" + sha256(request.source_bytes).hexdigest(),
+                            },
+                            "template": {
+                                "name": request.template_name,
+                                "rules_count": len(template_rules),
+                            },
+                            "ai": {
+                                "api_host": self._api_host(request.api_config.get("api_url", "")),
+                                "model": request.api_config.get("model", ""),
+                                "raw_prompt_persisted": False,
+                                "raw_response_persisted": False,
+                            },
+                            "result": {
+                                "output_reused": True,
+                                "output_persisted": False,
+                                "output_sha256": "sha256:" + sha256(output_bytes).hexdigest(),
+                            },
+                            "warnings": warnings,
+                            "error": None,
+                        },
+                    )
+                    emit(RunStage.COMPLETED, RunStatus.SUCCEEDED, "completed", cached=True)
+                    return DocumentFormatResult(
+                        status=RunStatus.SUCCEEDED,
+                        final_stage=RunStage.COMPLETED,
+                        run_id=run_id,
+                        output_bytes=output_bytes,
+                        warnings=warnings,
+                        stage_history=stage_history,
+                    )
+
             input_path = Path(temp_dir) / "input.docx"
             input_path.write_bytes(request.source_bytes)
             emit(RunStage.INPUT_STAGED, RunStatus.RUNNING, "input staged")
@@ -114,6 +242,7 @@ class DocumentFormatHarness:
             if not doc_processor.read_document(str(input_path)):
                 raise HarnessFailure(RuntimeErrorCode.DOCUMENT_READ_FAILED, "document read failed")
             paragraphs = doc_processor.get_document_text()
+            char_count = sum(len(paragraph) for paragraph in paragraphs)
             emit(
                 RunStage.DOCUMENT_LOADED,
                 RunStatus.RUNNING,
@@ -121,13 +250,6 @@ class DocumentFormatHarness:
                 paragraph_count=len(paragraphs),
             )
 
-            if request.template_rules is not None:
-                template_rules = normalize_template_rules(request.template_rules)
-            else:
-                template = self.format_manager.get_template(request.template_name)
-                if not template:
-                    raise HarnessFailure(RuntimeErrorCode.TEMPLATE_NOT_FOUND, "template not found")
-                template_rules = normalize_template_rules(template.get("rules", {}))
             emit(
                 RunStage.TEMPLATE_RESOLVED,
                 RunStatus.RUNNING,
@@ -135,46 +257,66 @@ class DocumentFormatHarness:
                 template_name=request.template_name,
             )
 
-            ai_connector = self.ai_connector_factory(request.api_config)
-            valid, error_msg = ai_connector.validate_config()
+            # Validation costs a network round trip. Start it only once the
+            # document is known to be readable, and overlap it with the local
+            # structure analysis and prompt building; the stage events are
+            # still emitted in their usual order.
+            validation_future = _VALIDATION_EXECUTOR.submit(ai_connector.validate_config)
+            flush_events()
+
+            if char_count >= STRUCTURE_ANALYSIS_MIN_CHARS:
+                try:
+                    features = self.structure_analyzer.analyze_text_features(paragraphs)
+                    self.structure_analyzer.generate_structure_hints(features)
+                except Exception as exc:
+                    warnings.append(str(exc))
+
+            prompt = ai_connector.generate_prompt(paragraphs, template_rules)
+            Path(temp_dir, "prompt.txt").write_text(prompt, encoding="utf-8")
+
+            valid, error_msg = validation_future.result()
             if not valid:
                 raise HarnessFailure(
                     RuntimeErrorCode.INVALID_API_CONFIG,
                     self._sanitize_error_message(RuntimeErrorCode.INVALID_API_CONFIG, error_msg),
                 )
             emit(RunStage.API_VALIDATED, RunStatus.RUNNING, "api validated")
-
-            try:
-                features = self.structure_analyzer.analyze_text_features(paragraphs)
-                self.structure_analyzer.generate_structure_hints(features)
-            except Exception as exc:
-                warnings.append(str(exc))
             emit(RunStage.STRUCTURE_HINTED, RunStatus.RUNNING, "structure hints ready")
-
-            prompt = ai_connector.generate_prompt(paragraphs, template_rules)
-            Path(temp_dir, "prompt.txt").write_text(prompt, encoding="utf-8")
             emit(RunStage.PROMPT_BUILT, RunStatus.RUNNING, "prompt built")
+            flush_events()
 
-            success, response = ai_connector.send_request(prompt)
-            if not success:
-                raise HarnessFailure(
-                    RuntimeErrorCode.AI_REQUEST_FAILED,
-                    self._sanitize_error_message(RuntimeErrorCode.AI_REQUEST_FAILED, response),
-                )
-            Path(temp_dir, "ai_response.json").write_text(json.dumps(response, ensure_ascii=False, indent=2), encoding="utf-8")
-            emit(RunStage.AI_RESPONSE_RECEIVED, RunStatus.RUNNING, "response received")
+            cache_key = None
+            formatting_instructions = None
+            if self.response_cache is not None:
+                cache_key = self.response_cache.make_key(request.api_config, prompt)
+                formatting_instructions = self.response_cache.get(cache_key)
 
-            success, formatting_instructions = ai_connector.parse_response(response)
-            if not success:
-                raise HarnessFailure(
-                    RuntimeErrorCode.AI_RESPONSE_INVALID,
-                    self._sanitize_error_message(RuntimeErrorCode.AI_RESPONSE_INVALID, formatting_instructions),
-                )
+            if formatting_instructions is not None:
+                emit(RunStage.AI_RESPONSE_RECEIVED, RunStatus.RUNNING, "response reused from cache", cached=True)
+            else:
+                success, response = ai_connector.send_request(prompt)
+                if not success:
+                    raise HarnessFailure(
+                        RuntimeErrorCode.AI_REQUEST_FAILED,
+                        self._sanitize_error_message(RuntimeErrorCode.AI_REQUEST_FAILED, response),
+                    )
+                self._write_json(Path(temp_dir, "ai_response.json"), response)
+                emit(RunStage.AI_RESPONSE_RECEIVED, RunStatus.RUNNING, "response received")
+
+                success, formatting_instructions = ai_connector.parse_response(response)
+                if not success:
+                    raise HarnessFailure(
+                        RuntimeErrorCode.AI_RESPONSE_INVALID,
+                        self._sanitize_error_message(RuntimeErrorCode.AI_RESPONSE_INVALID, formatting_instructions),
+                    )
+                if cache_key is not None:
+                    self.response_cache.put(cache_key, formatting_instructions)
+                response = None
+            # The prompt and raw response are on disk now; drop them before rendering
+            # to lower peak memory on large documents
+            prompt = None
             _, formatting_instructions = self.structure_analyzer.validate_structure(formatting_instructions)
-            Path(temp_dir, "formatting_instructions.json").write_text(
-                json.dumps(formatting_instructions, ensure_ascii=False, indent=2),
-                encoding="utf-8",
-            )
+            self._write_json(Path(temp_dir, "formatting_instructions.json"), formatting_instructions)
             instruction_count = len(formatting_instructions.get("elements", []))
             emit(
                 RunStage.PLAN_VALIDATED,
@@ -183,19 +325,36 @@ class DocumentFormatHarness:
                 instruction_count=instruction_count,
             )
 
-            hf_config = HeaderFooterConfig.from_dict(request.header_footer_config)
-            is_valid_hf, hf_error = hf_config.validate()
-            if not is_valid_hf:
-                raise HarnessFailure(
-                    RuntimeErrorCode.HEADER_FOOTER_INVALID,
-                    self._sanitize_error_message(RuntimeErrorCode.HEADER_FOOTER_INVALID, hf_error),
-                )
             emit(RunStage.HEADER_FOOTER_VALIDATED, RunStatus.RUNNING, "header/footer validated")
+            flush_events()
+
+            last_progress_at = [None]
+
+            def report_render_progress(processed, total):
+                # Large documents would flood the sink with one event per batch; throttle
+                # to a minimum interval but always send the final batch
+                now = time.monotonic()
+                if (
+                    processed < total
+                    and last_progress_at[0] is not None
+                    and now - last_progress_at[0] < RENDER_PROGRESS_MIN_INTERVAL
+                ):
+                    return
+                last_progress_at[0] = now
+                # Render progress goes to live subscribers only, never to events.jsonl
+                event_sink.emit({
+                    "timestamp": iso_now(),
+                    "stage": RunStage.DOCUMENT_RENDERING.value,
+                    "status": RunStatus.RUNNING.value,
+                    "processed_elements": processed,
+                    "total_elements": total,
+                })
 
             render_report = doc_processor.apply_formatting(
                 formatting_instructions,
                 custom_save_path=str(temp_dir),
                 header_footer_config=hf_config,
+                progress_callback=report_render_progress,
             )
             if isinstance(render_report, bool):
                 render_report = {
@@ -213,11 +372,21 @@ class DocumentFormatHarness:
             emit(RunStage.DOCUMENT_RENDERED, RunStatus.RUNNING, "document rendered")
 
             output_path = doc_processor.get_output_file()
-            if not output_path or not Path(output_path).exists():
+            # The source document is not needed after rendering; release it early to
+            # lower peak memory during output validation
+            doc_processor = None
+            if not output_path:
+                raise HarnessFailure(RuntimeErrorCode.OUTPUT_NOT_FOUND, "output file not found")
+            # Read the output directly and let a missing file raise, instead of a
+            # separate exists() check
+            try:
+                output_bytes = Path(output_path).read_bytes()
+            except FileNotFoundError:
                 raise HarnessFailure(RuntimeErrorCode.OUTPUT_NOT_FOUND, "output file not found")
-            output_bytes = Path(output_path).read_bytes()
             output_validation = self._validate_output_document(output_path, output_bytes)
             emit(RunStage.OUTPUT_READY, RunStatus.RUNNING, "output ready")
+            if output_key is not None:
+                self.output_cache.put(output_key, output_bytes)
 
             self.run_store.write_manifest(
                 run_dir,
@@ -234,7 +403,7 @@ class DocumentFormatHarness:
                         "size_bytes": len(request.source_bytes),
                         "sha256": "sha256:" + sha256(request.source_bytes).hexdigest(),
                         "paragraph_count": len(paragraphs),
-                        "char_count": sum(len(paragraph) for paragraph in paragraphs),
+                        "char_count": char_count,
                     },
                     "template": {
                         "name": request.template_name,
@@ -358,8 +527,18 @@ class DocumentFormatHarness:
                 error_message=generic_message,
             )
         finally:
+            if validation_future is not None:
+                # Never leave a validation request using the connector's
+                # session after the run has ended.
+                wait((validation_future,))
+            flush_events()
             shutil.rmtree(temp_dir, ignore_errors=True)
 
+    def _write_json(self, path, payload):
+        # json.dump writes in chunks instead of building the whole string in memory
+        with Path(path).open("w", encoding="utf-8") as handle:
+            json.dump(payload, handle, ensure_ascii=False, indent=2)
+
     def _api_host(self, api_url):
         sanitized = str(api_url or "").replace("https://", "").replace("http://", "")
         return sanitized.split("/")[0]
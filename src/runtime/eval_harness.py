@@ -5,6 +5,7 @@ import argparse
 import io
 import json
 from datetime import datetime, timezone
+from functools import partial
 from pathlib import Path
 from uuid import uuid4
 
@@ -68,11 +69,12 @@ class EvalDocProcessor(DocProcessor):
         3: "justify",
     }
 
-    def apply_formatting(self, formatting_instructions, custom_save_path=None, header_footer_config=None):
+    def apply_formatting(self, formatting_instructions, custom_save_path=None, header_footer_config=None, progress_callback=None):
         report = super().apply_formatting(
             formatting_instructions,
             custom_save_path=custom_save_path,
             header_footer_config=header_footer_config,
+            progress_callback=progress_callback,
         )
 
         output_file = report.get("output_file")
@@ -153,7 +155,7 @@ class RuntimeEvalHarness:
         harness = DocumentFormatHarness(
             runtime_dir=self.runtime_dir,
             doc_processor_factory=EvalDocProcessor,
-            ai_connector_factory=lambda config, replay=ai_case: ReplayAIConnector(config, replay),
+            ai_connector_factory=partial(ReplayAIConnector, ai_case=ai_case),
         )
 
         result = harness.run(
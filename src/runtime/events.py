@@ -5,16 +5,20 @@
 class NullEventSink:
     """No-op sink for runtime events."""
 
+    __slots__ = ()
+
     def emit(self, event: dict):
         """Ignore event payloads."""
         return None
 
 
 class CallbackEventSink:
-    """Adapter around a callable callback."""
+    """Adapter around a callable callback.
+
+    ``emit`` is the callback itself, bound per instance, so each event calls
+    it directly instead of going through a forwarding method frame.
+    """
 
     def __init__(self, callback):
         self.callback = callback
-
-    def emit(self, event: dict):
-        self.callback(event)
+        self.emit = callback
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""In-memory caches of parsed AI formatting plans and rendered outputs."""
+
+import json
+import threading
+from collections import OrderedDict
+from hashlib import sha256
+
+
+class ResponseCache:
+    """Bounded LRU cache mapping a prompt fingerprint to parsed instructions.
+
+    Entries live only in process memory so raw AI output is never persisted.
+    """
+
+    __slots__ = ("max_entries", "_entries", "_lock")
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(api_config, prompt):
+        payload = json.dumps(
+            [api_config.get("api_url", ""), api_config.get("model", ""), prompt],
+            ensure_ascii=False,
+        )
+        return sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        serialized = self._get_entry(key)
+        # Each hit gets a fresh copy so callers may mutate the plan freely.
+        return None if serialized is None else json.loads(serialized)
+
+    def put(self, key, instructions):
+        self._put_entry(key, json.dumps(instructions, ensure_ascii=False))
+
+    def _get_entry(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _put_entry(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class OutputCache(ResponseCache):
+    """LRU cache mapping a run's inputs to the rendered document bytes.
+
+    The cache is shared by every session in the process, so it is bounded by
+    the total size of the stored documents as well as by entry count.
+    """
+
+    __slots__ = ("max_bytes", "_total_bytes")
+
+    def __init__(self, max_entries=8, max_bytes=32 * 1024 * 1024):
+        super().__init__(max_entries=max_entries)
+        self.max_bytes = max_bytes
+        self._total_bytes = 0
+
+    @staticmethod
+    def make_key(source_bytes, template_rules, api_config, header_footer_config, language=None):
+        digest = sha256(source_bytes)
+        digest.update(
+            json.dumps(
+                [
+                    template_rules,
+                    api_config.get("api_url", ""),
+                    # Only a digest of the key enters the cache key, so a hit
+                    # is never served to a session using different credentials.
+                    sha256(str(api_config.get("api_key", "")).encode("utf-8")).hexdigest(),
+                    api_config.get("model", ""),
+                    header_footer_config,
+                    language,
+                ],
+                ensure_ascii=False,
+                sort_keys=True,
+            ).encode("utf-8")
+        )
+        return digest.hexdigest()
+
+    def get(self, key):
+        return self._get_entry(key)
+
+    def put(self, key, output_bytes):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= len(previous)
+            # A document larger than the whole budget is simply not cached.
+            if len(output_bytes) > self.max_bytes:
+                return
+            self._entries[key] = output_bytes
+            self._total_bytes += len(output_bytes)
+            while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= len(evicted)
+
+    @property
+    def total_bytes(self):
+        return self._total_bytes
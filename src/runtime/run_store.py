@@ -10,20 +10,16 @@ from uuid import uuid4
 class RunStore:
     """Create run directories and persist sanitized run metadata."""
 
+    __slots__ = ("base_dir",)
+
     def __init__(self, base_dir="runtime"):
         self.base_dir = Path(base_dir)
 
     def create_run_dirs(self):
-        now = datetime.now(timezone.utc)
-        run_id = f"{now.strftime('%Y%m%dT%H%M%SZ')}_{uuid4().hex[:8]}"
-        run_dir = (
-            self.base_dir
-            / "runs"
-            / now.strftime("%Y")
-            / now.strftime("%m")
-            / now.strftime("%d")
-            / run_id
-        )
+        # Format the timestamp once; the date directories are slices of it.
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        run_id = f"{stamp}_{uuid4().hex[:8]}"
+        run_dir = self.base_dir / "runs" / stamp[:4] / stamp[4:6] / stamp[6:8] / run_id
         temp_dir = self.base_dir / "tmp" / run_id
         run_dir.mkdir(parents=True, exist_ok=True)
         temp_dir.mkdir(parents=True, exist_ok=True)
@@ -38,3 +34,8 @@ class RunStore:
     def append_event(self, run_dir, payload):
         with Path(run_dir, "events.jsonl").open("a", encoding="utf-8") as handle:
             handle.write(json.dumps(payload, ensure_ascii=False) + "\n")
+
+    def append_events(self, run_dir, payloads):
+        lines = "".join(json.dumps(payload, ensure_ascii=False) + "\n" for payload in payloads)
+        with Path(run_dir, "events.jsonl").open("a", encoding="utf-8") as handle:
+            handle.write(lines)
@@ -31,7 +31,10 @@ class ConfigManager:
         # 加载配置
         self.api_config = self._load_config(self.api_config_file)
         self.app_config = self._load_config(self.app_config_file)
-        self.templates = self._load_templates()
+        # 记录应用配置在磁盘上的快照，用于跳过无变化的保存
+        self._app_config_snapshot = self._snapshot(self.app_config)
+        # 模板延迟到首次访问时加载，避免启动时扫描整个模板目录
+        self._templates = None
         
         app_logger.info("配置管理器初始化完成")
     
@@ -71,6 +74,13 @@ class ConfigManager:
             app_logger.error(f"保存配置文件失败: {config_file}, 错误: {str(e)}")
             return False
     
+    @property
+    def templates(self):
+        """排版模板字典，首次访问时从磁盘加载"""
+        if self._templates is None:
+            self._templates = self._load_templates()
+        return self._templates
+
     def _load_templates(self):
         """加载所有排版模板"""
         templates = {}
@@ -108,9 +118,22 @@ class ConfigManager:
         return self.app_config
     
     def save_app_config(self, app_config):
-        """保存应用配置"""
+        """保存应用配置，内容与磁盘上一致时跳过写入"""
         self.app_config = app_config
-        return self._save_config(app_config, self.app_config_file)
+        snapshot = self._snapshot(app_config)
+        if snapshot == self._app_config_snapshot:
+            app_logger.debug(f"应用配置未变化，跳过保存: {self.app_config_file}")
+            return True
+        
+        saved = self._save_config(app_config, self.app_config_file)
+        if saved:
+            self._app_config_snapshot = snapshot
+        return saved
+    
+    @staticmethod
+    def _snapshot(config):
+        """生成配置的规范化序列化结果，用于比较内容是否变化"""
+        return json.dumps(config, ensure_ascii=False, sort_keys=True)
     
     def get_templates(self):
         """获取所有排版模板"""
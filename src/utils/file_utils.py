@@ -5,8 +5,8 @@
 """
 
 import os
-import time
 import shutil
+import stat
 from datetime import datetime
 from .logger import app_logger
 
@@ -21,30 +21,29 @@ def generate_output_filename(input_file, custom_save_path=None):
     Returns:
         输出文件路径
     """
-    # 获取文件名和扩展名
-    filename, ext = os.path.splitext(os.path.basename(input_file))
+    # 拆分一次路径，目录与文件名后续复用
+    input_dir, basename = os.path.split(input_file)
+    filename, ext = os.path.splitext(basename)
     
     # 初始输出文件名
     output_filename = f"{filename}_已排版{ext}"
     
-    # 如果指定了自定义保存路径，则使用该路径
+    # 如果指定了自定义保存路径，则使用该路径（isdir已确认目录存在，无需再次检查）
     if custom_save_path and os.path.isdir(custom_save_path):
         app_logger.debug(f"使用自定义保存路径: {custom_save_path}")
         output_dir = custom_save_path
     else:
         # 否则使用原文件所在目录
-        output_dir = os.path.dirname(input_file)
+        output_dir = input_dir
         app_logger.debug(f"使用原文件目录作为保存路径: {output_dir}")
-    
-    # 确保输出目录存在
-    if not os.path.exists(output_dir):
-        try:
-            os.makedirs(output_dir)
-            app_logger.debug(f"创建输出目录: {output_dir}")
-        except Exception as e:
-            app_logger.error(f"创建输出目录失败: {output_dir}, 错误: {str(e)}")
-            # 如果创建目录失败，则使用原文件目录
-            output_dir = os.path.dirname(input_file)
+        
+        # 确保输出目录存在
+        if output_dir and not os.path.isdir(output_dir):
+            try:
+                os.makedirs(output_dir, exist_ok=True)
+                app_logger.debug(f"创建输出目录: {output_dir}")
+            except Exception as e:
+                app_logger.error(f"创建输出目录失败: {output_dir}, 错误: {str(e)}")
     
     output_path = os.path.join(output_dir, output_filename)
     
@@ -87,26 +86,30 @@ def is_valid_docx(file_path):
     Returns:
         是否是有效的Word文档
     """
-    if not os.path.exists(file_path):
-        app_logger.warning(f"文件不存在: {file_path}")
-        return False
-    
-    # 检查扩展名
+    # 先检查扩展名，无需访问磁盘
     _, ext = os.path.splitext(file_path)
     if ext.lower() != '.docx':
         app_logger.warning(f"非Word文档格式: {file_path}")
         return False
-    
-    # 检查文件大小
+
+    # 一次stat同时完成存在性、文件类型与文件大小检查
     try:
-        file_size = os.path.getsize(file_path)
-        if file_size == 0:
-            app_logger.warning(f"空文件: {file_path}")
-            return False
+        file_stat = os.stat(file_path)
+    except FileNotFoundError:
+        app_logger.warning(f"文件不存在: {file_path}")
+        return False
     except Exception as e:
         app_logger.error(f"检查文件大小失败: {file_path}, 错误: {str(e)}")
         return False
-    
+
+    if not stat.S_ISREG(file_stat.st_mode):
+        app_logger.warning(f"不是普通文件: {file_path}")
+        return False
+
+    if file_stat.st_size == 0:
+        app_logger.warning(f"空文件: {file_path}")
+        return False
+
     return True
 
 def backup_file(file_path):
@@ -4,21 +4,54 @@
 负责获取系统字体、验证字体可用性和提供字体映射功能。
 """
 
+import importlib.util
 import json
 import os
 import platform
 import subprocess
 
-try:
-    from PyQt6.QtGui import QFont, QFontDatabase
-    PYQT_AVAILABLE = True
-except Exception:  # pragma: no cover - optional dependency
-    QFont = None
-    QFontDatabase = None
-    PYQT_AVAILABLE = False
+from docx.shared import Pt
 
 from ..utils.logger import app_logger
 
+# 中文字号到磅值的映射，与具体实例无关，模块导入时只构建一次，各处理器共享
+FONT_SIZE_MAPPING = {
+    "初号": Pt(42),
+    "小初": Pt(36),
+    "一号": Pt(26),
+    "小一": Pt(24),
+    "二号": Pt(22),
+    "小二": Pt(18),
+    "三号": Pt(16),
+    "小三": Pt(15),
+    "四号": Pt(14),
+    "小四": Pt(12),
+    "五号": Pt(10.5),
+    "小五": Pt(9),
+    "六号": Pt(7.5),
+    "小六": Pt(6.5),
+    "七号": Pt(5.5),
+    "八号": Pt(5)
+}
+
+# PyQt6只用于可选的字体探测：这里只检查是否安装，真正的导入推迟到启用探测时，
+# 避免默认关闭探测的情况下也承担加载Qt的开销
+PYQT_AVAILABLE = importlib.util.find_spec("PyQt6") is not None
+QFont = None
+QFontDatabase = None
+
+
+def _import_pyqt_fonts():
+    """按需导入PyQt6字体类，返回是否导入成功"""
+    global QFont, QFontDatabase
+    if QFontDatabase is None:
+        try:
+            from PyQt6.QtGui import QFont, QFontDatabase
+        except Exception as e:  # pragma: no cover - optional dependency
+            app_logger.debug(f"导入PyQt6字体模块失败: {str(e)}")
+            return False
+    return True
+
 
 class FontManager:
     """字体管理器，负责获取和验证系统字体"""
@@ -163,8 +196,10 @@ class FontManager:
         self.display_to_system_mapping = {}
         self.font_availability_cache = {}
         self.en_to_cn_mapping = {}
-        self._pyqt_font_probe_enabled = PYQT_AVAILABLE and (
-            os.getenv("FORMULAAI_ENABLE_PYQT_FONTS", "").strip().lower() in {"1", "true", "yes", "on"}
+        self._pyqt_font_probe_enabled = (
+            PYQT_AVAILABLE
+            and os.getenv("FORMULAAI_ENABLE_PYQT_FONTS", "").strip().lower() in {"1", "true", "yes", "on"}
+            and _import_pyqt_fonts()
         )
 
         self.load_system_fonts()
@@ -194,6 +229,8 @@ class FontManager:
     def _discover_fonts_via_system_tools(self):
         """使用系统命令发现字体，避免依赖GUI运行时。"""
         fonts = []
+        # fc-list在字体较多的系统上会输出数千行，用集合去重避免列表成员检查的平方级开销
+        seen = set()
         system = platform.system()
         app_logger.debug(f"当前操作系统: {system}")
 
@@ -210,7 +247,8 @@ class FontManager:
                     for line in result.stdout.splitlines():
                         for font in line.split(","):
                             name = font.strip()
-                            if name and name not in fonts:
+                            if name and name not in seen:
+                                seen.add(name)
                                 fonts.append(name)
             except Exception as e:
                 app_logger.debug(f"fc-list获取字体失败: {str(e)}")
@@ -228,7 +266,8 @@ class FontManager:
                     for line in result.stdout.splitlines():
                         if "Full Name:" in line:
                             name = line.split("Full Name:")[1].strip()
-                            if name and name not in fonts:
+                            if name and name not in seen:
+                                seen.add(name)
                                 fonts.append(name)
             except Exception as e:
                 app_logger.debug(f"system_profiler获取字体失败: {str(e)}")
@@ -4,11 +4,12 @@
 负责记录应用程序的日志信息，并提供日志显示和管理功能。
 """
 
+import atexit
 import logging
 import os
-import time
+import queue
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 class Logger:
     """日志管理器类。管理日志的创建、格式化和输出。"""
@@ -31,14 +32,25 @@ class Logger:
         if not os.path.exists(log_dir):
             os.makedirs(log_dir)
             
-        # 创建日志文件
-        self._setup_file_handler()
-        
-        # 创建控制台处理器
-        self._setup_console_handler()
+        # 文件与控制台输出交给后台监听线程，调用方只负责入队
+        self._queue_listener = QueueListener(
+            queue.SimpleQueue(),
+            self._setup_file_handler(),
+            self._setup_console_handler(),
+            respect_handler_level=True
+        )
+        self.logger.addHandler(QueueHandler(self._queue_listener.queue))
+        self._queue_listener.start()
+        atexit.register(self.stop)
+    
+    def stop(self):
+        """停止后台日志线程，并写出队列中剩余的日志"""
+        if self._queue_listener is not None:
+            self._queue_listener.stop()
+            self._queue_listener = None
     
     def _setup_file_handler(self):
-        """设置文件日志处理器"""
+        """创建文件日志处理器"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.log_file = os.path.join(self.log_dir, f"aipolidoc_{timestamp}.log")
         
@@ -55,10 +67,10 @@ class Logger:
         )
         file_handler.setFormatter(formatter)
         
-        self.logger.addHandler(file_handler)
+        return file_handler
     
     def _setup_console_handler(self):
-        """设置控制台日志处理器"""
+        """创建控制台日志处理器"""
         console_handler = logging.StreamHandler()
         console_handler.setLevel(logging.DEBUG)  # 修改为调试级别，以显示更多日志
         
@@ -67,7 +79,7 @@ class Logger:
         )
         console_handler.setFormatter(formatter)
         
-        self.logger.addHandler(console_handler)
+        return console_handler
     
     def add_ui_handler(self, callback):
         """
@@ -1,6 +1,10 @@
 # -*- coding: utf-8 -*-
 """Tests for AIConnector methods that do not require network."""
 
+import socket
+import threading
+
+from src.core import ai_connector
 from src.core.ai_connector import AIConnector
 
 
@@ -77,3 +81,114 @@ def test_validate_config_rejects_blank_values_without_request():
 
     assert success is False
     assert "API URL不能为空" in message
+
+
+def test_validate_config_reuses_successful_result_until_forced(monkeypatch):
+    requests_sent = []
+
+    class Response:
+        status_code = 200
+        text = ""
+
+    def fake_send_test_request(self):
+        requests_sent.append(self.api_url)
+        return Response()
+
+    monkeypatch.setattr(AIConnector, "_send_test_request", fake_send_test_request)
+    config = {"api_url": "https://example.com", "api_key": "key", "model": "demo"}
+    connector = AIConnector(config)
+
+    assert connector.validate_config()[0] is True
+    assert connector.validate_config()[0] is True
+    assert len(requests_sent) == 1
+
+    assert connector.validate_config(force=True)[0] is True
+    assert len(requests_sent) == 2
+
+    # Results are scoped to the connector, not shared across instances.
+    assert AIConnector(config).validate_config()[0] is True
+    assert len(requests_sent) == 3
+
+
+def test_validate_config_expires_cached_result(monkeypatch):
+    requests_sent = []
+
+    class Response:
+        status_code = 200
+        text = ""
+
+    def fake_send_test_request(self):
+        requests_sent.append(self.api_url)
+        return Response()
+
+    monkeypatch.setattr(AIConnector, "_send_test_request", fake_send_test_request)
+    connector = AIConnector({"api_url": "https://example.com", "api_key": "key", "model": "demo"})
+
+    assert connector.validate_config()[0] is True
+    connector._validated_at -= ai_connector.VALIDATION_TTL
+    assert connector.validate_config()[0] is True
+    assert len(requests_sent) == 2
+
+    connector.update_config({"api_url": "https://example.com", "api_key": "other", "model": "demo"})
+    assert connector.validate_config()[0] is True
+    assert len(requests_sent) == 3
+
+
+def test_update_config_keeps_http_session():
+    connector = AIConnector({"api_url": "https://example.com", "api_key": "key", "model": "demo"})
+    session = connector.session
+
+    connector.update_config({"api_url": "https://example.org", "api_key": "other", "model": "next", "timeout": 30})
+
+    assert connector.session is session
+    assert connector.api_url == "https://example.org"
+    assert connector.model == "next"
+    assert connector.timeout == 30
+
+
+def test_session_retries_only_rate_limits_with_separate_connect_timeout():
+    connector = AIConnector({"api_url": "https://example.com", "api_key": "key", "model": "demo", "timeout": 60})
+
+    retry = connector.session.get_adapter("https://example.com").max_retries
+    assert retry.total == 2
+    assert retry.read is False
+    assert set(retry.status_forcelist) == {429}
+    # Gateway errors may arrive after the upstream processed the POST.
+    assert not retry.is_retry("POST", 504)
+    assert retry.is_retry("POST", 429)
+    assert connector.request_timeout == (5, 60)
+
+
+def test_send_request_does_not_resend_post_after_read_timeout():
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(5)
+    server.settimeout(0.1)
+    accepted = []
+    stop = threading.Event()
+
+    def accept_and_hang():
+        # Accept connections but never answer, so every request hits the read timeout.
+        while not stop.is_set():
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                continue
+            accepted.append(conn)
+
+    thread = threading.Thread(target=accept_and_hang, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.getsockname()[1]}/v1/chat"
+    connector = AIConnector({"api_url": url, "api_key": "key", "model": "demo", "timeout": 0.5})
+
+    try:
+        success, _ = connector.send_request("prompt")
+    finally:
+        stop.set()
+        thread.join(timeout=5)
+        server.close()
+        for conn in accepted:
+            conn.close()
+
+    assert success is False
+    assert len(accepted) == 1
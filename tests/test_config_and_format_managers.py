@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 """Tests for config manager and format manager behavior."""
 
+import os
+
 from src.core.format_manager import FormatManager
 from src.utils.config_manager import ConfigManager
 
@@ -75,3 +77,81 @@ def test_format_manager_converts_docx_params(tmp_path):
     assert params["underline"] is True
     assert params["alignment"] == "center"
     assert params["first_line_indent"] == 21
+
+
+def test_config_manager_loads_templates_on_first_access(tmp_path):
+    config_dir = tmp_path / "config"
+    ConfigManager(str(config_dir)).save_template("测试模板", {"rules": {}})
+
+    manager = ConfigManager(str(config_dir))
+
+    assert manager._templates is None
+    assert "测试模板" in manager.get_templates()
+    assert manager._templates is not None
+
+
+def test_format_manager_template_names_are_sorted_and_track_changes(tmp_path):
+    manager = FormatManager(str(tmp_path / "templates"))
+    rules = {"正文": {"font": "宋体", "size": "小四"}}
+
+    manager.save_template("b模板", {"rules": rules})
+    manager.save_template("a模板", {"rules": rules})
+    assert manager.get_template_names() == ["a模板", "b模板"]
+
+    manager.delete_template("a模板")
+    assert manager.get_template_names() == ["b模板"]
+
+
+def test_format_manager_skips_rewrite_when_template_unchanged(tmp_path):
+    manager = FormatManager(str(tmp_path / "templates"))
+    template = {"rules": {"正文": {"font": "宋体", "size": "小四"}}}
+    template_file = tmp_path / "templates" / "测试模板.json"
+
+    assert manager.save_template("测试模板", template)
+    os.utime(template_file, ns=(0, 0))
+
+    assert manager.save_template("测试模板", dict(template))
+    assert template_file.stat().st_mtime_ns == 0
+
+    template["rules"]["正文"]["size"] = "四号"
+    assert manager.save_template("测试模板", template)
+    assert template_file.stat().st_mtime_ns != 0
+    assert "四号" in template_file.read_text(encoding="utf-8")
+
+
+def test_format_manager_reload_only_reparses_changed_files(tmp_path):
+    manager = FormatManager(str(tmp_path / "templates"))
+    rules = {"正文": {"font": "宋体", "size": "小四"}}
+    manager.save_template("甲", {"rules": rules})
+    manager.save_template("乙", {"rules": rules})
+    manager.save_template("丙", {"rules": rules})
+
+    manager.load_templates()
+    unchanged = manager.get_template("甲")
+    changed_file = tmp_path / "templates" / "乙.json"
+    changed_file.write_text('{"name": "乙", "rules": {"正文": {"font": "黑体", "size": "四号"}}}', encoding="utf-8")
+    os.utime(changed_file, ns=(0, 0))
+    (tmp_path / "templates" / "丙.json").unlink()
+    manager.load_templates()
+
+    assert manager.get_template("甲") is unchanged
+    assert manager.get_template("乙")["rules"]["正文"]["font"] == "黑体"
+    assert manager.get_template_names() == sorted(["甲", "乙"])
+
+
+def test_config_manager_skips_saving_unchanged_app_config(tmp_path):
+    config_dir = tmp_path / "config"
+    manager = ConfigManager(str(config_dir))
+    app_config_file = config_dir / "app_config.json"
+
+    app_config = manager.get_app_config()
+    app_config["language"] = "en"
+    assert manager.save_app_config(app_config)
+    os.utime(app_config_file, ns=(0, 0))
+
+    assert manager.save_app_config(manager.get_app_config())
+    assert app_config_file.stat().st_mtime_ns == 0
+
+    app_config["language"] = "zh"
+    assert manager.save_app_config(app_config)
+    assert app_config_file.stat().st_mtime_ns != 0
@@ -4,6 +4,7 @@
 from pathlib import Path
 
 from docx import Document
+from docx.shared import Pt
 
 from src.core.doc_processor import DocProcessor
 from src.core.header_footer_config import HeaderFooterConfig
@@ -61,3 +62,50 @@ def test_apply_formatting_returns_structured_render_report(tmp_path):
     assert Path(report["output_file"]).exists()
     assert report["header_footer"]["attempted"] is True
     assert report["header_footer"]["success"] is True
+
+
+def test_apply_formatting_reports_progress_per_batch(tmp_path):
+    input_path = tmp_path / "input.docx"
+    _make_input_docx(input_path)
+
+    processor = DocProcessor()
+    assert processor.read_document(str(input_path)) is True
+    progress = []
+
+    report = processor.apply_formatting(
+        {"elements": [{"type": "正文", "content": f"段落{i}", "format": {}} for i in range(15)]},
+        custom_save_path=str(tmp_path),
+        progress_callback=lambda processed, total: progress.append((processed, total)),
+    )
+
+    assert report["processed_elements"] == 15
+    assert progress == [(10, 15), (15, 15)]
+
+
+def test_read_document_rejects_directory_with_docx_suffix(tmp_path):
+    fake_docx = tmp_path / "folder.docx"
+    fake_docx.mkdir()
+
+    assert DocProcessor().read_document(str(fake_docx)) is False
+
+
+def test_apply_formatting_only_maps_supported_font_sizes(tmp_path):
+    input_path = tmp_path / "input.docx"
+    _make_input_docx(input_path)
+
+    processor = DocProcessor()
+    assert processor.read_document(str(input_path)) is True
+
+    report = processor.apply_formatting(
+        {
+            "elements": [
+                {"type": "正文", "content": "小四正文", "format": {"size": "小四"}},
+                {"type": "标题", "content": "二号标题", "format": {"size": "二号"}},
+            ]
+        },
+        custom_save_path=str(tmp_path),
+    )
+
+    sizes = [paragraph.runs[0].font.size for paragraph in Document(report["output_file"]).paragraphs]
+    assert sizes[0] == Pt(12)
+    assert sizes[1] is None
@@ -2,6 +2,8 @@
 """Tests for the runtime document-format harness."""
 
 import json
+import threading
+import time
 from pathlib import Path
 
 from docx import Document
@@ -92,7 +94,7 @@ class ReportingDocProcessor:
     def get_document_text(self):
         return ["论文标题", "这是正文。"]
 
-    def apply_formatting(self, formatting_instructions, custom_save_path=None, header_footer_config=None):
+    def apply_formatting(self, formatting_instructions, custom_save_path=None, header_footer_config=None, progress_callback=None):
         output_path = Path(custom_save_path) / "output.docx"
         document = Document()
         for element in formatting_instructions["elements"]:
@@ -115,7 +117,7 @@ class ReportingDocProcessor:
 
 
 class FailedReportingDocProcessor(ReportingDocProcessor):
-    def apply_formatting(self, formatting_instructions, custom_save_path=None, header_footer_config=None):
+    def apply_formatting(self, formatting_instructions, custom_save_path=None, header_footer_config=None, progress_callback=None):
         return {
             "success": False,
             "total_elements": len(formatting_instructions["elements"]),
@@ -129,7 +131,7 @@ class FailedReportingDocProcessor(ReportingDocProcessor):
 
 
 class MissingOutputReportingDocProcessor(ReportingDocProcessor):
-    def apply_formatting(self, formatting_instructions, custom_save_path=None, header_footer_config=None):
+    def apply_formatting(self, formatting_instructions, custom_save_path=None, header_footer_config=None, progress_callback=None):
         self.output_file = None
         return {
             "success": True,
@@ -175,6 +177,7 @@ def test_document_format_harness_happy_path(tmp_path):
     assert result.instruction_count == 2
     assert result.output_path is None
     assert result.stage_history[0].stage == RunStage.INIT
+    assert all(record.started_at == record.ended_at for record in result.stage_history)
     assert result.render_report["processed_elements"] == 2
     manifests = list((tmp_path / "runtime" / "runs").rglob("manifest.json"))
     assert manifests
@@ -255,6 +258,8 @@ def test_document_format_harness_invalid_header_footer_returns_failed_result(tmp
 
     assert result.status == RunStatus.FAILED
     assert result.error_code == RuntimeErrorCode.HEADER_FOOTER_INVALID
+    # Invalid local settings fail before the input is staged or the AI is called.
+    assert [record.stage for record in result.stage_history] == [RunStage.INIT, RunStage.FAILED]
 
 
 def test_document_format_harness_ai_request_failure_returns_failed_result(tmp_path):
@@ -338,3 +343,319 @@ def test_document_format_harness_missing_output_returns_failed_result(tmp_path):
 
     assert result.status == RunStatus.FAILED
     assert result.error_code == RuntimeErrorCode.OUTPUT_NOT_FOUND
+
+
+def test_document_format_harness_skips_api_validation_when_document_is_unreadable(tmp_path):
+    validations = []
+
+    class RecordingAIConnector(FakeAIConnector):
+        def validate_config(self):
+            validations.append(True)
+            return super().validate_config()
+
+    class UnreadableDocProcessor(ReportingDocProcessor):
+        def read_document(self, file_path):
+            return False
+
+    harness = DocumentFormatHarness(
+        runtime_dir=tmp_path / "runtime",
+        format_manager=FakeFormatManager(),
+        doc_processor_factory=UnreadableDocProcessor,
+        ai_connector_factory=RecordingAIConnector,
+    )
+
+    result = harness.run(
+        source_name="input.docx",
+        source_bytes=_docx_bytes(),
+        template_name="测试模板",
+        api_config={"api_url": "https://example.com", "api_key": "k", "model": "demo", "timeout": 1},
+        header_footer_config={},
+    )
+
+    assert result.error_code == RuntimeErrorCode.DOCUMENT_READ_FAILED
+    assert not validations
+
+
+def test_document_format_harness_overlaps_api_validation_with_prompt_building(tmp_path):
+    prompt_started = threading.Event()
+
+    class WaitingAIConnector(FakeAIConnector):
+        def validate_config(self):
+            # Only succeeds if the prompt is being built while validation runs.
+            return (prompt_started.wait(timeout=2), "ok")
+
+        def generate_prompt(self, paragraphs, rules):
+            prompt_started.set()
+            return super().generate_prompt(paragraphs, rules)
+
+    harness = DocumentFormatHarness(
+        runtime_dir=tmp_path / "runtime",
+        format_manager=FakeFormatManager(),
+        doc_processor_factory=ReportingDocProcessor,
+        ai_connector_factory=WaitingAIConnector,
+    )
+
+    result = harness.run(
+        source_name="input.docx",
+        source_bytes=_docx_bytes(),
+        template_name="测试模板",
+        api_config={"api_url": "https://example.com", "api_key": "k", "model": "demo", "timeout": 1},
+        header_footer_config={},
+    )
+
+    assert result.status == RunStatus.SUCCEEDED
+    stages = [record.stage for record in result.stage_history]
+    assert stages.index(RunStage.API_VALIDATED) < stages.index(RunStage.STRUCTURE_HINTED) < stages.index(RunStage.PROMPT_BUILT)
+
+
+def test_document_format_harness_waits_for_validation_before_returning(tmp_path):
+    validation_finished = threading.Event()
+
+    class SlowAIConnector(FakeAIConnector):
+        def validate_config(self):
+            time.sleep(0.2)
+            validation_finished.set()
+            return True, "ok"
+
+        def generate_prompt(self, paragraphs, rules):
+            raise RuntimeError("prompt failed")
+
+    harness = DocumentFormatHarness(
+        runtime_dir=tmp_path / "runtime",
+        format_manager=FakeFormatManager(),
+        doc_processor_factory=ReportingDocProcessor,
+        ai_connector_factory=SlowAIConnector,
+    )
+
+    result = harness.run(
+        source_name="input.docx",
+        source_bytes=_docx_bytes(),
+        template_name="测试模板",
+        api_config={"api_url": "https://example.com", "api_key": "k", "model": "demo", "timeout": 1},
+        header_footer_config={},
+    )
+
+    assert result.error_code == RuntimeErrorCode.RUNTIME_INTERNAL_ERROR
+    assert validation_finished.is_set()
+
+
+def test_document_format_harness_flushes_events_before_the_ai_request(tmp_path):
+    persisted_stages = []
+
+    class InspectingAIConnector(FakeAIConnector):
+        def send_request(self, prompt):
+            (events_file,) = (tmp_path / "runtime" / "runs").rglob("events.jsonl")
+            for line in events_file.read_text(encoding="utf-8").splitlines():
+                persisted_stages.append(json.loads(line)["stage"])
+            return super().send_request(prompt)
+
+    harness = DocumentFormatHarness(
+        runtime_dir=tmp_path / "runtime",
+        format_manager=FakeFormatManager(),
+        doc_processor_factory=ReportingDocProcessor,
+        ai_connector_factory=InspectingAIConnector,
+    )
+
+    result = harness.run(
+        source_name="input.docx",
+        source_bytes=_docx_bytes(),
+        template_name="测试模板",
+        api_config={"api_url": "https://example.com", "api_key": "k", "model": "demo", "timeout": 1},
+        header_footer_config={},
+    )
+
+    assert result.status == RunStatus.SUCCEEDED
+    assert persisted_stages[0] == RunStage.INIT.value
+    assert persisted_stages[-1] == RunStage.PROMPT_BUILT.value
+
+
+def test_document_format_harness_reuses_cached_plan_for_identical_prompt(tmp_path):
+    from src.runtime.response_cache import ResponseCache
+
+    requests_sent = []
+
+    class CountingAIConnector(FakeAIConnector):
+        def send_request(self, prompt):
+            requests_sent.append(prompt)
+            return super().send_request(prompt)
+
+    harness = DocumentFormatHarness(
+        runtime_dir=tmp_path / "runtime",
+        format_manager=FakeFormatManager(),
+        doc_processor_factory=ReportingDocProcessor,
+        ai_connector_factory=CountingAIConnector,
+        response_cache=ResponseCache(),
+    )
+    run_kwargs = {
+        "source_name": "input.docx",
+        "source_bytes": _docx_bytes(),
+        "template_name": "测试模板",
+        "api_config": {"api_url": "https://example.com", "api_key": "k", "model": "demo", "timeout": 1},
+        "header_footer_config": {},
+    }
+
+    first = harness.run(**run_kwargs)
+    second = harness.run(**run_kwargs)
+
+    assert first.status == RunStatus.SUCCEEDED
+    assert second.status == RunStatus.SUCCEEDED
+    assert second.instruction_count == first.instruction_count
+    assert len(requests_sent) == 1
+
+
+def test_document_format_harness_reuses_output_but_still_validates_and_records_run(tmp_path):
+    from src.runtime.response_cache import OutputCache
+
+    requests_sent = []
+    validations = []
+    revoked_keys = set()
+
+    class CountingAIConnector(FakeAIConnector):
+        def validate_config(self):
+            validations.append(self.api_config["api_key"])
+            if self.api_config["api_key"] in revoked_keys:
+                return False, "invalid api key"
+            return True, "ok"
+
+        def send_request(self, prompt):
+            requests_sent.append(prompt)
+            return super().send_request(prompt)
+
+    harness = DocumentFormatHarness(
+        runtime_dir=tmp_path / "runtime",
+        format_manager=FakeFormatManager(),
+        doc_processor_factory=ReportingDocProcessor,
+        ai_connector_factory=CountingAIConnector,
+        output_cache=OutputCache(),
+    )
+    run_kwargs = {
+        "source_name": "input.docx",
+        "source_bytes": _docx_bytes(),
+        "template_name": "测试模板",
+        "api_config": {"api_url": "https://example.com", "api_key": "k", "model": "demo", "timeout": 1},
+        "header_footer_config": {},
+    }
+
+    first = harness.run(**run_kwargs)
+    second = harness.run(**run_kwargs)
+
+    assert second.status == RunStatus.SUCCEEDED
+    assert second.output_bytes == first.output_bytes
+    assert len(requests_sent) == 1
+    assert validations == ["k", "k"]
+    assert [record.stage for record in second.stage_history][-2:] == [RunStage.OUTPUT_READY, RunStage.COMPLETED]
+    run_dir = next((tmp_path / "runtime" / "runs").rglob(second.run_id))
+    manifest = json.loads((run_dir / "manifest.json").read_text(encoding="utf-8"))
+    assert manifest["status"] == "success"
+    assert manifest["result"]["output_reused"] is True
+    assert (run_dir / "events.jsonl").exists()
+
+    # A different key never hits the entry, and a rejected key fails instead of reusing it.
+    other_key = dict(run_kwargs, api_config=dict(run_kwargs["api_config"], api_key="other"))
+    assert harness.run(**other_key).status == RunStatus.SUCCEEDED
+    assert len(requests_sent) == 2
+
+    revoked_keys.add("k")
+    revoked = harness.run(**run_kwargs)
+    assert revoked.status == RunStatus.FAILED
+    assert revoked.error_code == RuntimeErrorCode.INVALID_API_CONFIG
+
+
+def test_document_format_harness_skips_structure_analysis_for_short_documents(tmp_path):
+    analyzed = []
+
+    class RecordingStructureAnalyzer:
+        def analyze_text_features(self, paragraphs):
+            analyzed.append(paragraphs)
+            return {}
+
+        def generate_structure_hints(self, features):
+            return {}
+
+        def validate_structure(self, structure):
+            return True, structure
+
+    class LongDocProcessor(ReportingDocProcessor):
+        def get_document_text(self):
+            return ["论文标题", "这是正文。" * 500]
+
+    def run(doc_processor_factory):
+        harness = DocumentFormatHarness(
+            runtime_dir=tmp_path / "runtime",
+            format_manager=FakeFormatManager(),
+            doc_processor_factory=doc_processor_factory,
+            ai_connector_factory=FakeAIConnector,
+            structure_analyzer=RecordingStructureAnalyzer(),
+        )
+        return harness.run(
+            source_name="input.docx",
+            source_bytes=_docx_bytes(),
+            template_name="测试模板",
+            api_config={"api_url": "https://example.com", "api_key": "k", "model": "demo", "timeout": 1},
+            header_footer_config={},
+        )
+
+    assert run(ReportingDocProcessor).status == RunStatus.SUCCEEDED
+    assert analyzed == []
+
+    assert run(LongDocProcessor).status == RunStatus.SUCCEEDED
+    assert len(analyzed) == 1
+
+
+def test_document_format_harness_throttles_render_progress_events(tmp_path):
+    from src.runtime.events import CallbackEventSink
+
+    class BatchReportingDocProcessor(ReportingDocProcessor):
+        def apply_formatting(self, formatting_instructions, custom_save_path=None, header_footer_config=None, progress_callback=None):
+            for processed in range(1, 51):
+                progress_callback(processed, 50)
+            return super().apply_formatting(formatting_instructions, custom_save_path, header_footer_config)
+
+    events = []
+    harness = DocumentFormatHarness(
+        runtime_dir=tmp_path / "runtime",
+        format_manager=FakeFormatManager(),
+        doc_processor_factory=BatchReportingDocProcessor,
+        ai_connector_factory=FakeAIConnector,
+    )
+
+    result = harness.run(
+        source_name="input.docx",
+        source_bytes=_docx_bytes(),
+        template_name="测试模板",
+        api_config={"api_url": "https://example.com", "api_key": "k", "model": "demo", "timeout": 1},
+        header_footer_config={},
+        event_sink=CallbackEventSink(events.append),
+    )
+
+    progress = [event["processed_elements"] for event in events if event["stage"] == RunStage.DOCUMENT_RENDERING.value]
+    assert result.status == RunStatus.SUCCEEDED
+    assert progress[0] == 1
+    assert progress[-1] == 50
+    assert len(progress) < 50
+
+
+
+def test_document_format_harness_skips_template_scan_when_rules_are_given(tmp_path, monkeypatch):
+    import src.runtime.document_format_harness as harness_module
+
+    def fail_format_manager():
+        raise AssertionError("template directory should not be scanned")
+
+    monkeypatch.setattr(harness_module, "FormatManager", fail_format_manager)
+    harness = DocumentFormatHarness(
+        runtime_dir=tmp_path / "runtime",
+        doc_processor_factory=ReportingDocProcessor,
+        ai_connector_factory=FakeAIConnector,
+    )
+
+    result = harness.run(
+        source_name="input.docx",
+        source_bytes=_docx_bytes(),
+        template_name="测试模板",
+        template_rules=FakeFormatManager().template["rules"],
+        api_config={"api_url": "https://example.com", "api_key": "k", "model": "demo", "timeout": 1},
+        header_footer_config={},
+    )
+
+    assert result.status == RunStatus.SUCCEEDED
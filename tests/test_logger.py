@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+"""Tests for the application logger."""
+
+from src.utils.logger import Logger
+
+
+def test_logger_writes_queued_records_by_the_time_it_stops(tmp_path):
+    logger = Logger(name="test_logger_queue", log_dir=str(tmp_path))
+    for index in range(100):
+        logger.info(f"queued message {index}")
+
+    logger.stop()
+    # Stopping again, as the atexit hook does, is a no-op.
+    logger.stop()
+
+    with open(logger.log_file, encoding="utf-8") as handle:
+        content = handle.read()
+    assert "queued message 0" in content
+    assert "queued message 99" in content
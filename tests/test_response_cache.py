@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""Tests for the in-memory AI response cache."""
+
+from src.runtime.response_cache import OutputCache, ResponseCache
+
+
+def test_response_cache_returns_independent_copies():
+    cache = ResponseCache()
+    key = cache.make_key({"api_url": "https://example.com", "model": "demo"}, "prompt")
+    cache.put(key, {"elements": [{"type": "正文"}]})
+
+    hit = cache.get(key)
+    hit["elements"].clear()
+
+    assert cache.get(key) == {"elements": [{"type": "正文"}]}
+
+
+def test_response_cache_keys_depend_on_model_and_evict_least_recent():
+    cache = ResponseCache(max_entries=2)
+    key_a = cache.make_key({"api_url": "u", "model": "a"}, "prompt")
+    key_b = cache.make_key({"api_url": "u", "model": "b"}, "prompt")
+    key_c = cache.make_key({"api_url": "u", "model": "c"}, "prompt")
+    assert key_a != key_b
+
+    cache.put(key_a, {"elements": []})
+    cache.put(key_b, {"elements": []})
+    cache.get(key_a)
+    cache.put(key_c, {"elements": []})
+
+    assert len(cache) == 2
+    assert cache.get(key_b) is None
+    assert cache.get(key_a) is not None
+
+
+def test_output_cache_is_bounded_by_total_bytes():
+    cache = OutputCache(max_entries=8, max_bytes=10)
+
+    cache.put("a", b"1234")
+    cache.put("b", b"5678")
+    cache.get("a")
+    cache.put("c", b"90ab")
+
+    assert cache.total_bytes <= 10
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1234"
+    assert cache.get("c") == b"90ab"
+
+    cache.put("huge", b"x" * 11)
+    assert cache.get("huge") is None
+    assert cache.total_bytes == 8
@@ -16,6 +16,18 @@ def test_run_store_creates_manifest_and_event_log(tmp_path: Path):
 
     assert run_id
     assert run_dir.exists()
+    assert run_dir.relative_to(tmp_path).parts == ("runs", run_id[:4], run_id[4:6], run_id[6:8], run_id)
     assert temp_dir.exists()
     assert json.loads((run_dir / "manifest.json").read_text(encoding="utf-8"))["run_id"] == run_id
     assert (run_dir / "events.jsonl").exists()
+
+
+def test_run_store_appends_event_batches_in_order(tmp_path: Path):
+    store = RunStore(base_dir=tmp_path)
+    _, run_dir, _ = store.create_run_dirs()
+
+    store.append_event(run_dir, {"stage": "INIT"})
+    store.append_events(run_dir, [{"stage": "INPUT_STAGED"}, {"stage": "COMPLETED"}])
+
+    lines = (run_dir / "events.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["stage"] for line in lines] == ["INIT", "INPUT_STAGED", "COMPLETED"]
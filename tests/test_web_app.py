@@ -33,6 +33,8 @@ def test_process_document_uses_runtime_harness(monkeypatch):
             return b"payload"
 
     monkeypatch.setattr(web_app, "DocumentFormatHarness", FakeHarness)
+    output_cache = web_app.OutputCache()
+    monkeypatch.setattr(web_app, "get_output_cache", lambda: output_cache)
     monkeypatch.setattr(web_app, "add_log", lambda message, level="INFO": logs.append(message))
     web_app.st.session_state.language = "zh"
 
@@ -73,6 +75,8 @@ def test_process_document_translates_runtime_failure(monkeypatch):
             return b"payload"
 
     monkeypatch.setattr(web_app, "DocumentFormatHarness", FakeHarness)
+    output_cache = web_app.OutputCache()
+    monkeypatch.setattr(web_app, "get_output_cache", lambda: output_cache)
     web_app.st.session_state.language = "zh"
 
     try:
@@ -91,6 +95,45 @@ def test_process_document_translates_runtime_failure(monkeypatch):
         raise AssertionError("Expected ValueError")
 
 
+def test_process_document_passes_shared_caches_to_harness(monkeypatch):
+    harness_kwargs = {}
+    logs = []
+
+    class FakeResult:
+        output_bytes = b"docx-bytes"
+        error_message = None
+        error_code = None
+
+    class FakeHarness:
+        def __init__(self, *args, **kwargs):
+            harness_kwargs.update(kwargs)
+
+        def run(self, **kwargs):
+            kwargs["event_sink"].emit({"stage": "COMPLETED", "cached": True})
+            return FakeResult()
+
+    class FakeFormatManager:
+        def get_template(self, name):
+            return {"rules": {"正文": {"font": "宋体", "size": "小四"}}}
+
+    class Uploaded:
+        name = "input.docx"
+
+        def getvalue(self):
+            return b"payload"
+
+    output_cache = web_app.OutputCache()
+    monkeypatch.setattr(web_app, "DocumentFormatHarness", FakeHarness)
+    monkeypatch.setattr(web_app, "get_output_cache", lambda: output_cache)
+    monkeypatch.setattr(web_app, "get_format_manager", FakeFormatManager)
+    monkeypatch.setattr(web_app, "add_log", lambda message, level="INFO": logs.append(message))
+    web_app.st.session_state.language = "zh"
+
+    assert web_app.process_document(Uploaded(), "测试模板", "https://example.com", "key", "demo", {}) == b"docx-bytes"
+    assert harness_kwargs["output_cache"] is output_cache
+    assert web_app.t("log_output_reused") in logs
+
+
 def test_normalize_template_rules_available_from_web_app():
     normalized = web_app.normalize_template_rules(
         {"正文": {"font": "宋体", "size": "小四", "alignment": "两端对齐"}}
@@ -107,6 +150,13 @@ def test_runtime_stage_progress_maps_runtime_stages_to_percentages():
     assert web_app.runtime_stage_progress("UNKNOWN") is None
 
 
+def test_runtime_event_progress_interpolates_render_progress():
+    render_event = {"stage": web_app.RunStage.DOCUMENT_RENDERING.value, "processed_elements": 5, "total_elements": 10}
+
+    assert web_app.runtime_event_progress({"stage": "DOCUMENT_LOADED"}) == 25
+    assert web_app.runtime_event_progress(render_event) == 90
+
+
 def test_page_document_format_shows_download_button_immediately_after_success(monkeypatch):
     class SessionState(dict):
         def __getattr__(self, name):
@@ -243,3 +293,96 @@ def test_page_document_format_shows_download_button_immediately_after_success(mo
     assert fake_st.session_state.output_bytes == b"docx-bytes"
     assert len(fake_st.download_calls) == 1
     assert fake_st.download_calls[0]["data"] == b"docx-bytes"
+
+
+def test_add_log_keeps_only_most_recent_entries(monkeypatch):
+    monkeypatch.setattr(web_app, "MAX_LOG_ENTRIES", 3)
+    web_app.st.session_state.logs = []
+
+    for index in range(5):
+        web_app.add_log(f"message {index}")
+
+    logs = web_app.st.session_state.logs
+    assert len(logs) == 3
+    assert logs[0].endswith("message 2")
+    assert logs[-1].endswith("message 4")
+
+
+def test_get_format_manager_reuses_session_instance_and_reloads(monkeypatch):
+    created = []
+    reloads = []
+
+    class FakeFormatManager:
+        def __init__(self):
+            created.append(self)
+
+        def load_templates(self):
+            reloads.append(self)
+
+    monkeypatch.setattr(web_app, "FormatManager", FakeFormatManager)
+    web_app.st.session_state.format_manager = None
+
+    first = web_app.get_format_manager()
+    second = web_app.get_format_manager()
+
+    assert first is second
+    assert len(created) == 1
+    assert reloads == [first]
+
+
+def test_get_config_manager_is_scoped_to_the_session(monkeypatch):
+    created = []
+
+    class FakeConfigManager:
+        def __init__(self):
+            created.append(self)
+
+    monkeypatch.setattr(web_app, "ConfigManager", FakeConfigManager)
+    web_app.st.session_state.config_manager = None
+
+    first = web_app.get_config_manager()
+    assert web_app.get_config_manager() is first
+
+    # A new session starts without the key and gets its own manager.
+    del web_app.st.session_state["config_manager"]
+    assert web_app.get_config_manager() is not first
+    assert len(created) == 2
+
+
+def test_get_ai_connector_reuses_session_and_updates_config():
+    web_app.st.session_state.ai_connector = None
+
+    first = web_app.get_ai_connector({"api_url": "https://example.com", "api_key": "k", "model": "a"})
+    second = web_app.get_ai_connector({"api_url": "https://example.com", "api_key": "k", "model": "b"})
+
+    assert first is second
+    assert second.model == "b"
+
+
+def test_render_logs_coalesces_consecutive_plain_entries(monkeypatch):
+    calls = []
+
+    class FakeStreamlit:
+        def text(self, value):
+            calls.append(("text", value))
+
+        def error(self, value):
+            calls.append(("error", value))
+
+        def warning(self, value):
+            calls.append(("warning", value))
+
+    monkeypatch.setattr(web_app, "st", FakeStreamlit())
+
+    web_app.render_logs([
+        "[10:00:00] [INFO] a",
+        "[10:00:00] [INFO] b",
+        "[10:00:01] [ERROR] c",
+        "[10:00:01] [INFO] d",
+    ])
+
+    assert calls == [
+        ("text", "[10:00:00] [INFO] a\n[10:00:00] [INFO] b"),
+        ("error", "[10:00:01] [ERROR] c"),
+        ("text", "[10:00:01] [INFO] d"),
+    ]
@@ -8,10 +8,10 @@ FormulaAI Web - AI智能文档排版工具 (Web版)
 """
 
 import streamlit as st
-import tempfile
 import os
+import re
 import sys
-from datetime import datetime
+import time
 
 # 添加项目根目录到路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -19,16 +19,14 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 # 导入核心模块
 from src.core.ai_connector import AIConnector
 from src.core.format_manager import FormatManager
-from src.core.doc_processor import DocProcessor
-from src.core.structure_analyzer import StructureAnalyzer
 from src.core.header_footer_config import HeaderFooterConfig
 from src.core.text_template_parser import TextTemplateParser
 from src.runtime.events import CallbackEventSink
-from src.runtime.contracts import RuntimeErrorCode
+from src.runtime.contracts import RunStage, RuntimeErrorCode
 from src.runtime.document_format_harness import DocumentFormatHarness
+from src.runtime.response_cache import OutputCache, ResponseCache
 from src.runtime.template_rules import normalize_alignment, normalize_template_rules
 from src.utils.config_manager import ConfigManager
-from src.utils.logger import app_logger
 
 
 # ========================
@@ -44,8 +42,7 @@ st.set_page_config(
 # ========================
 # 样式设置
 # ========================
-st.markdown("""
-<style>
+APP_CSS = """
     /* 主色调 */
     :root {
         --primary-color: #2563eb;
@@ -81,20 +78,6 @@ st.markdown("""
         border-bottom: 2px solid var(--primary-color);
     }
 
-    /* 卡片样式 */
-    .card {
-        background: var(--card-bg);
-        border: 1px solid var(--border-color);
-        border-radius: 12px;
-        padding: 1.5rem;
-        margin-bottom: 1rem;
-        box-shadow: 0 1px 3px rgba(0,0,0,0.05);
-    }
-
-    .card:hover {
-        box-shadow: 0 4px 12px rgba(0,0,0,0.1);
-    }
-
     /* 按钮美化 */
     .stButton>button {
         border-radius: 8px;
@@ -107,16 +90,6 @@ st.markdown("""
         box-shadow: 0 4px 12px rgba(37, 99, 235, 0.3);
     }
 
-    .stButton>button[kind="primary"] {
-        background: var(--primary-color);
-        border-color: var(--primary-color);
-    }
-
-    .stButton>button[kind="primary"]:hover {
-        background: var(--primary-hover);
-        border-color: var(--primary-hover);
-    }
-
     /* 输入框美化 */
     .stTextInput>div>div>input,
     .stTextArea>div>div>textarea {
@@ -248,11 +221,6 @@ st.markdown("""
         overflow: hidden;
     }
 
-    /* 进度条美化 */
-    .stProgress > div > div > div {
-        background: var(--primary-color);
-    }
-
     /* 下载按钮特殊样式 */
     .stDownloadButton>button {
         background: var(--success-color);
@@ -282,21 +250,6 @@ st.markdown("""
         text-decoration: underline;
     }
 
-    /* 模板卡片 */
-    .template-card {
-        background: var(--card-bg);
-        border: 1px solid var(--border-color);
-        border-radius: 12px;
-        padding: 1rem 1.25rem;
-        margin-bottom: 0.75rem;
-        transition: all 0.2s ease;
-    }
-
-    .template-card:hover {
-        border-color: var(--primary-color);
-        box-shadow: 0 4px 12px rgba(37, 99, 235, 0.1);
-    }
-
     /* JSON显示美化 */
     .stJson {
         border-radius: 8px;
@@ -304,35 +257,22 @@ st.markdown("""
         padding: 1rem;
     }
 
-    /* 状态指示器 */
-    .status-indicator {
-        display: inline-flex;
-        align-items: center;
-        gap: 0.5rem;
-        padding: 0.5rem 1rem;
-        border-radius: 20px;
-        font-size: 0.875rem;
-        font-weight: 500;
-    }
-
-    .status-ok {
-        background: #d1fae5;
-        color: #065f46;
+    /* 帮助页版本信息 */
+    .help-footer {
+        text-align: center;
+        color: #666;
     }
 
-    .status-warning {
-        background: #fef3c7;
-        color: #92400e;
+    /* 侧边栏标志 */
+    .sidebar-logo {
+        text-align: center;
+        padding: 1rem 0;
     }
 
-    /* 页脚样式 */
-    .footer {
-        text-align: center;
-        color: var(--text-secondary);
-        font-size: 0.875rem;
-        margin-top: 2rem;
-        padding-top: 1rem;
-        border-top: 1px solid var(--border-color);
+    .sidebar-logo-mark {
+        font-size: 3rem;
+        margin-bottom: 0.5rem;
+        color: #3b82f6;
     }
 
     /* 响应式优化 */
@@ -340,12 +280,34 @@ st.markdown("""
         .main-header {
             font-size: 1.5rem;
         }
-        .card {
-            padding: 1rem;
-        }
     }
-</style>
-""", unsafe_allow_html=True)
+"""
+
+
+def minify_css(css: str) -> str:
+    """去掉注释与多余空白，减少每次重跑发送到前端的样式体积"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    return re.sub(r"\s*([{};:,>])\s*", r"\1", css).strip()
+
+
+@st.cache_resource
+def get_app_style() -> str:
+    """压缩后的页面样式在进程内只生成一次，主脚本每次重跑直接复用"""
+    return f"<style>{minify_css(APP_CSS)}</style>"
+
+
+st.markdown(get_app_style(), unsafe_allow_html=True)
+
+# 固定不变的页面HTML片段，定义为模块常量，每次重跑不再重新拼接
+PAGE_HEADER_HTML = '<p class="main-header">{}</p>'
+SIDEBAR_LOGO_HTML = (
+    '<div class="sidebar-logo"><div class="sidebar-logo-mark"><span>F</span></div></div>'
+)
+HELP_FOOTER_HTML = (
+    '<div class="help-footer">FormulaAI Web v2.0.0 | '
+    '<a href="https://github.com/waterdrop26651/FormulaAI" target="_blank">GitHub</a></div>'
+)
 
 
 # ========================
@@ -386,7 +348,17 @@ def init_session_state():
 init_session_state()
 
 # 加载持久化配置
-config_manager = ConfigManager()
+def get_config_manager():
+    """获取会话内复用的配置管理器，避免每次重跑都重新读取配置文件；
+    每个会话持有独立实例，保存配置时不会与其他会话并发修改同一对象"""
+    manager = st.session_state.get("config_manager")
+    if manager is None:
+        manager = ConfigManager()
+        st.session_state.config_manager = manager
+    return manager
+
+
+config_manager = get_config_manager()
 
 
 # ========================
@@ -436,6 +408,7 @@ TRANSLATIONS = {
         "log_ai_received": "AI响应已接收",
         "log_generated_instructions": "排版指令已生成，共 {count} 个元素",
         "log_format_complete": "文档排版完成！",
+        "log_output_reused": "文档、模板与设置均未变化，直接复用上次的排版结果",
         "error_doc_read_failed": "文档读取失败",
         "error_template_not_found": "模板 '{name}' 不存在",
         "error_invalid_api_config": "API配置无效: {message}",
@@ -585,6 +558,7 @@ FormulaAI 是一款基于AI的智能文档排版工具，能够自动识别文
         "log_ai_received": "AI response received",
         "log_generated_instructions": "Generated formatting instructions for {count} elements",
         "log_format_complete": "Document formatting completed",
+        "log_output_reused": "Document, template and settings are unchanged; reusing the previous result",
         "error_doc_read_failed": "Failed to read the document",
         "error_template_not_found": "Template '{name}' does not exist",
         "error_invalid_api_config": "Invalid API configuration: {message}",
@@ -704,6 +678,17 @@ ELEMENT_TYPE_LABELS = {
     "参考文献": {"zh": "参考文献", "en": "References"},
 }
 
+# 模板编辑器的选项列表，模块级常量避免每次重跑都重新构建
+TEMPLATE_ELEMENT_TYPES = tuple(ELEMENT_TYPE_LABELS)
+TEMPLATE_FONTS = ('宋体', '黑体', '楷体', '仿宋', 'Times New Roman', 'Arial')
+TEMPLATE_SIZES = ('初号', '小初', '一号', '小一', '二号', '小二', '三号', '小三', '四号', '小四', '五号', '小五', '六号')
+TEMPLATE_ALIGNMENTS = ('left', 'center', 'right', 'justify')
+
+ALIGNMENT_LABELS = {
+    "zh": {"left": "左对齐", "center": "居中", "right": "右对齐", "justify": "两端对齐"},
+    "en": {"left": "Left", "center": "Center", "right": "Right", "justify": "Justify"},
+}
+
 RUNTIME_STAGE_PROGRESS = {
     "INIT": 5,
     "INPUT_STAGED": 10,
@@ -720,11 +705,56 @@ RUNTIME_STAGE_PROGRESS = {
     "COMPLETED": 100,
 }
 
+# 需要写入会话日志的运行阶段：阶段 -> (文案键, {文案参数: 事件字段})
+RUNTIME_STAGE_LOGS = {
+    "DOCUMENT_LOADED": ("log_doc_read", {"count": "paragraph_count"}),
+    "TEMPLATE_RESOLVED": ("log_template_loaded", {"name": "template_name"}),
+    "PROMPT_BUILT": ("log_calling_ai", {}),
+    "AI_RESPONSE_RECEIVED": ("log_ai_received", {}),
+    "PLAN_VALIDATED": ("log_generated_instructions", {"count": "instruction_count"}),
+}
+
+# 运行错误码到界面提示文案的映射，文案可使用 {name}（模板名）与 {message}（错误信息）
+RUNTIME_ERROR_MESSAGES = {
+    RuntimeErrorCode.DOCUMENT_READ_FAILED: "error_doc_read_failed",
+    RuntimeErrorCode.TEMPLATE_NOT_FOUND: "error_template_not_found",
+    RuntimeErrorCode.INVALID_API_CONFIG: "error_invalid_api_config",
+    RuntimeErrorCode.AI_REQUEST_FAILED: "error_ai_request_failed",
+    RuntimeErrorCode.AI_RESPONSE_INVALID: "error_parse_response_failed",
+    RuntimeErrorCode.HEADER_FOOTER_INVALID: "error_invalid_header_footer",
+    RuntimeErrorCode.FORMATTING_FAILED: "error_formatting_failed",
+    RuntimeErrorCode.OUTPUT_NOT_FOUND: "error_output_not_found",
+}
+
+# 会话日志上限，超出后丢弃最旧的记录，避免长会话内存与渲染开销无限增长
+MAX_LOG_ENTRIES = 500
+LOG_LINE_FORMAT = "[{}] [{}] {}"
+
 
 def add_log(message: str, level: str = "INFO"):
     """添加日志"""
-    timestamp = datetime.now().strftime("%H:%M:%S")
-    st.session_state.logs.append(f"[{timestamp}] [{level}] {message}")
+    logs = st.session_state.logs
+    logs.append(LOG_LINE_FORMAT.format(time.strftime("%H:%M:%S"), level, message))
+    if len(logs) > MAX_LOG_ENTRIES:
+        del logs[:len(logs) - MAX_LOG_ENTRIES]
+
+
+def render_logs(logs):
+    """渲染日志，连续的普通日志合并为一个文本块，减少页面元素数量"""
+    pending = []
+    for log in logs:
+        if "[ERROR]" in log or "[WARNING]" in log:
+            if pending:
+                st.text("\n".join(pending))
+                pending = []
+            if "[ERROR]" in log:
+                st.error(log)
+            else:
+                st.warning(log)
+        else:
+            pending.append(log)
+    if pending:
+        st.text("\n".join(pending))
 
 
 def t(key: str, **kwargs):
@@ -745,6 +775,50 @@ def runtime_stage_progress(stage: str):
     return RUNTIME_STAGE_PROGRESS.get(stage)
 
 
+def runtime_event_progress(event: dict):
+    """将运行事件映射为进度百分比，渲染阶段按已处理元素数插值"""
+    if event.get("stage") == RunStage.DOCUMENT_RENDERING and event.get("total_elements"):
+        start = RUNTIME_STAGE_PROGRESS["HEADER_FOOTER_VALIDATED"]
+        end = RUNTIME_STAGE_PROGRESS["DOCUMENT_RENDERED"]
+        return start + (end - start) * event.get("processed_elements", 0) // event["total_elements"]
+    return runtime_stage_progress(event.get("stage"))
+
+
+@st.cache_resource
+def get_response_cache():
+    """进程内共享的AI响应缓存，相同文档与模板重复排版时跳过AI请求"""
+    return ResponseCache()
+
+
+@st.cache_resource
+def get_output_cache():
+    """进程内共享的排版结果缓存，输入完全相同时跳过整个排版流程"""
+    return OutputCache()
+
+
+def get_format_manager():
+    """获取会话内复用的模板管理器，每次访问都按修改时间增量重载模板目录，
+    其他会话保存或磁盘上修改的模板无需手动刷新即可生效"""
+    format_manager = st.session_state.get("format_manager")
+    if format_manager is None:
+        format_manager = FormatManager()
+        st.session_state.format_manager = format_manager
+    else:
+        format_manager.load_templates()
+    return format_manager
+
+
+def get_ai_connector(api_config):
+    """获取会话内复用的AI连接器，配置变化时只更新配置，保留已建立的HTTP连接"""
+    connector = st.session_state.get("ai_connector")
+    if connector is None:
+        connector = AIConnector(api_config)
+        st.session_state.ai_connector = connector
+    else:
+        connector.update_config(api_config)
+    return connector
+
+
 def load_api_config():
     """加载API配置"""
     api_config = config_manager.get_api_config()
@@ -768,7 +842,8 @@ def load_header_footer_config():
     app_config = config_manager.get_app_config()
     st.session_state.language = app_config.get('language', st.session_state.language)
     if 'header_footer_config' in app_config:
-        st.session_state.header_footer_config = app_config['header_footer_config']
+        # 复制一份，页面编辑时不会改动进程内共享的配置对象
+        st.session_state.header_footer_config = dict(app_config['header_footer_config'])
 
 
 def save_header_footer_config():
@@ -786,9 +861,11 @@ def save_language_config():
     config_manager.save_app_config(app_config)
 
 
-# 初始化时加载配置
-load_api_config()
-load_header_footer_config()
+# 持久化配置只在会话首次运行时载入，之后的重跑直接沿用会话状态
+if not st.session_state.get('config_loaded'):
+    load_api_config()
+    load_header_footer_config()
+    st.session_state.config_loaded = True
 
 
 # ========================
@@ -805,37 +882,46 @@ def process_document(
 ):
     """处理文档排版"""
     add_log(t("log_start_processing"))
+    log_defaults = {"count": 0, "name": template_name}
 
     def on_runtime_event(event: dict):
-        stage = event.get("stage")
         if runtime_event_handler:
             runtime_event_handler(event)
-        if stage == RuntimeErrorCode.RUNTIME_INTERNAL_ERROR.value:
-            return
-        if stage == "DOCUMENT_LOADED":
-            add_log(t("log_doc_read", count=event.get("paragraph_count", 0)))
-        elif stage == "TEMPLATE_RESOLVED":
-            add_log(t("log_template_loaded", name=event.get("template_name", template_name)))
-        elif stage == "PROMPT_BUILT":
-            add_log(t("log_calling_ai"))
-        elif stage == "AI_RESPONSE_RECEIVED":
-            add_log(t("log_ai_received"))
-        elif stage == "PLAN_VALIDATED":
-            add_log(t("log_generated_instructions", count=event.get("instruction_count", 0)))
-
-    harness = DocumentFormatHarness()
+        if event.get("stage") == RunStage.COMPLETED and event.get("cached"):
+            add_log(t("log_output_reused"))
+        log_entry = RUNTIME_STAGE_LOGS.get(event.get("stage"))
+        if log_entry:
+            key, fields = log_entry
+            add_log(t(key, **{arg: event.get(field, log_defaults[arg]) for arg, field in fields.items()}))
+
+    source_bytes = uploaded_file.getvalue()
+    api_config = {
+        "api_url": api_url,
+        "api_key": api_key,
+        "model": model,
+        "timeout": 300,
+    }
+    hf_config = hf_config or {}
+    language = st.session_state.get("language", "zh")
+
+    # 文档内容、模板规则与排版设置都相同时，harness校验API配置并记录运行后直接返回上次的排版结果
+    template = get_format_manager().get_template(template_name) or {}
+
+    # 已取到的模板规则直接交给harness，省去运行时再按名称查找一次
+    harness = DocumentFormatHarness(
+        format_manager=get_format_manager(),
+        ai_connector_factory=get_ai_connector,
+        response_cache=get_response_cache(),
+        output_cache=get_output_cache(),
+    )
     result = harness.run(
         source_name=uploaded_file.name,
-        source_bytes=uploaded_file.getvalue(),
+        source_bytes=source_bytes,
         template_name=template_name,
-        api_config={
-            "api_url": api_url,
-            "api_key": api_key,
-            "model": model,
-            "timeout": 300,
-        },
-        header_footer_config=hf_config or {},
-        language=st.session_state.get("language", "zh"),
+        template_rules=template.get("rules", {}) if template else None,
+        api_config=api_config,
+        header_footer_config=hf_config,
+        language=language,
         event_sink=CallbackEventSink(on_runtime_event),
     )
     if result.output_bytes is not None:
@@ -843,22 +929,9 @@ def process_document(
         return result.output_bytes
 
     error_message = result.error_message or ""
-    if result.error_code == RuntimeErrorCode.DOCUMENT_READ_FAILED:
-        raise ValueError(t("error_doc_read_failed"))
-    if result.error_code == RuntimeErrorCode.TEMPLATE_NOT_FOUND:
-        raise ValueError(t("error_template_not_found", name=template_name))
-    if result.error_code == RuntimeErrorCode.INVALID_API_CONFIG:
-        raise ValueError(t("error_invalid_api_config", message=error_message))
-    if result.error_code == RuntimeErrorCode.AI_REQUEST_FAILED:
-        raise ValueError(t("error_ai_request_failed", message=error_message))
-    if result.error_code == RuntimeErrorCode.AI_RESPONSE_INVALID:
-        raise ValueError(t("error_parse_response_failed", message=error_message))
-    if result.error_code == RuntimeErrorCode.HEADER_FOOTER_INVALID:
-        raise ValueError(t("error_invalid_header_footer", message=error_message))
-    if result.error_code == RuntimeErrorCode.FORMATTING_FAILED:
-        raise ValueError(t("error_formatting_failed"))
-    if result.error_code == RuntimeErrorCode.OUTPUT_NOT_FOUND:
-        raise ValueError(t("error_output_not_found"))
+    error_key = RUNTIME_ERROR_MESSAGES.get(result.error_code)
+    if error_key:
+        raise ValueError(t(error_key, name=template_name, message=error_message))
     raise ValueError(error_message or t("processing_failed", error=t("unknown")))
 
 
@@ -882,7 +955,7 @@ def render_download_result_button(uploaded_file):
 # ========================
 def page_document_format():
     """文档排版页面"""
-    st.markdown(f'<p class="main-header">{t("page_document_format")}</p>', unsafe_allow_html=True)
+    st.markdown(PAGE_HEADER_HTML.format(t("page_document_format")), unsafe_allow_html=True)
 
     # 检查API配置
     if not st.session_state.api_url or not st.session_state.api_key:
@@ -905,7 +978,7 @@ def page_document_format():
 
     with col2:
         st.subheader(t("template_selection"))
-        format_manager = FormatManager()
+        format_manager = get_format_manager()
         template_names = format_manager.get_template_names()
 
         if template_names:
@@ -951,7 +1024,8 @@ def page_document_format():
     col1, col2, col3 = st.columns([1, 1, 1])
 
     with col1:
-        can_format = uploaded_file and selected_template and st.session_state.api_url and st.session_state.api_key
+        # API配置已在页面顶部校验（缺失时st.stop()），这里只需检查文档与模板
+        can_format = bool(uploaded_file and selected_template)
         start_button = st.button(
             t("start_formatting"),
             type="primary",
@@ -979,11 +1053,14 @@ def page_document_format():
 
             try:
                 status_text.text(t("processing_document_status"))
-                progress_bar.progress(runtime_stage_progress("INIT") or 0)
+                # 记录已显示的进度，只在进度前进时才向前端推送更新
+                shown_progress = [runtime_stage_progress("INIT") or 0]
+                progress_bar.progress(shown_progress[0])
 
                 def handle_runtime_progress(event: dict):
-                    progress = runtime_stage_progress(event.get("stage"))
-                    if progress is not None:
+                    progress = runtime_event_progress(event)
+                    if progress is not None and progress > shown_progress[0]:
+                        shown_progress[0] = progress
                         progress_bar.progress(progress)
 
                 output_bytes = process_document(
@@ -996,7 +1073,8 @@ def page_document_format():
                     runtime_event_handler=handle_runtime_progress,
                 )
 
-                progress_bar.progress(runtime_stage_progress("COMPLETED") or 100)
+                if shown_progress[0] < 100:
+                    progress_bar.progress(100)
                 st.session_state.output_bytes = output_bytes
 
                 st.success(t("formatting_complete"))
@@ -1011,13 +1089,7 @@ def page_document_format():
         st.divider()
         st.subheader(t("processing_logs"))
         with st.container(height=200):
-            for log in st.session_state.logs:
-                if "[ERROR]" in log:
-                    st.error(log)
-                elif "[WARNING]" in log:
-                    st.warning(log)
-                else:
-                    st.text(log)
+            render_logs(st.session_state.logs)
 
 
 # ========================
@@ -1025,9 +1097,9 @@ def page_document_format():
 # ========================
 def page_template_management():
     """模板管理页面"""
-    st.markdown(f'<p class="main-header">{t("template_management_title")}</p>', unsafe_allow_html=True)
+    st.markdown(PAGE_HEADER_HTML.format(t("template_management_title")), unsafe_allow_html=True)
 
-    format_manager = FormatManager()
+    format_manager = get_format_manager()
 
     # 操作按钮
     col1, col2, col3 = st.columns([1, 1, 2])
@@ -1112,32 +1184,19 @@ def template_editor(format_manager: FormatManager):
     st.subheader(t("format_rules"))
 
     rules = normalize_template_rules(template.get('rules', {}))
-    element_types = ['标题', '一级标题', '二级标题', '三级标题', '正文', '摘要', '关键词', '参考文献']
-
-    # 字体选项
-    fonts = ['宋体', '黑体', '楷体', '仿宋', 'Times New Roman', 'Arial']
-    # 字号选项
-    sizes = ['初号', '小初', '一号', '小一', '二号', '小二', '三号', '小三', '四号', '小四', '五号', '小五', '六号']
-    # 对齐选项
-    alignments = ['left', 'center', 'right', 'justify']
-    alignment_names = {
-        'left': 'Left' if st.session_state.language == 'en' else '左对齐',
-        'center': 'Center' if st.session_state.language == 'en' else '居中',
-        'right': 'Right' if st.session_state.language == 'en' else '右对齐',
-        'justify': 'Justify' if st.session_state.language == 'en' else '两端对齐',
-    }
+    alignment_names = ALIGNMENT_LABELS['en' if st.session_state.language == 'en' else 'zh']
 
     # 添加新规则
     with st.expander(t("add_new_rule")):
-        new_type = st.selectbox(t("element_type"), element_types, format_func=element_type_label, key="new_rule_type")
+        new_type = st.selectbox(t("element_type"), TEMPLATE_ELEMENT_TYPES, format_func=element_type_label, key="new_rule_type")
 
         col1, col2, col3 = st.columns(3)
         with col1:
-            new_font = st.selectbox(t("font"), fonts, key="new_rule_font")
+            new_font = st.selectbox(t("font"), TEMPLATE_FONTS, key="new_rule_font")
         with col2:
-            new_size = st.selectbox(t("font_size"), sizes, key="new_rule_size")
+            new_size = st.selectbox(t("font_size"), TEMPLATE_SIZES, key="new_rule_size")
         with col3:
-            new_align = st.selectbox(t("alignment"), alignments, format_func=lambda x: alignment_names[x], key="new_rule_align")
+            new_align = st.selectbox(t("alignment"), TEMPLATE_ALIGNMENTS, format_func=alignment_names.get, key="new_rule_align")
 
         new_bold = st.checkbox(t("bold"), key="new_rule_bold")
 
@@ -1201,7 +1260,7 @@ def template_editor(format_manager: FormatManager):
 # ========================
 def page_api_config():
     """API配置页面"""
-    st.markdown(f'<p class="main-header">{t("page_api_config")}</p>', unsafe_allow_html=True)
+    st.markdown(PAGE_HEADER_HTML.format(t("page_api_config")), unsafe_allow_html=True)
 
     st.info(t("api_config_info"))
 
@@ -1279,8 +1338,8 @@ def page_api_config():
                             "api_key": api_key,
                             "model": model
                         }
-                        connector = AIConnector(api_config)
-                        valid, msg = connector.validate_config()
+                        # 用临时连接器测试表单中尚未保存的配置，不改动会话中排版使用的连接器
+                        valid, msg = AIConnector(api_config).validate_config()
                         if valid:
                             st.success(t("connection_success", model=model))
                         else:
@@ -1308,7 +1367,7 @@ def page_api_config():
 # ========================
 def page_text_parsing():
     """从文本解析模板页面"""
-    st.markdown(f'<p class="main-header">{t("page_text_parsing")}</p>', unsafe_allow_html=True)
+    st.markdown(PAGE_HEADER_HTML.format(t("page_text_parsing")), unsafe_allow_html=True)
 
     st.info(t("text_parsing_info"))
 
@@ -1327,6 +1386,8 @@ def page_text_parsing():
         height=200,
         placeholder=t("format_desc_placeholder")
     )
+    # 只规整一次输入文本，校验与AI请求共用同一份结果
+    format_text = (format_text or "").strip()
 
     if st.button(t("generate_template"), type="primary"):
         if not template_name:
@@ -1342,26 +1403,41 @@ def page_text_parsing():
                         "model": st.session_state.model,
                         "timeout": 120
                     }
-                    connector = AIConnector(api_config)
-                    parser = TextTemplateParser(connector)
-
-                    success, result = parser.parse_text_to_template(
-                        format_text,
-                        template_name=template_name,
-                        template_description=template_desc or template_name
+                    # 相同的格式要求（忽略空白差异）直接复用上次解析出的规则，跳过AI请求
+                    response_cache = get_response_cache()
+                    cache_key = response_cache.make_key(
+                        api_config, "text-template\n" + " ".join(format_text.split())
                     )
-                    if not success:
-                        st.error(t("parse_failed", message=result))
-                        return
+                    cached_rules = response_cache.get(cache_key)
+                    if cached_rules is not None:
+                        result = {
+                            "name": template_name,
+                            "description": template_desc or template_name,
+                            "rules": cached_rules,
+                        }
+                    else:
+                        connector = get_ai_connector(api_config)
+                        parser = TextTemplateParser(connector)
+
+                        success, result = parser.parse_text_to_template(
+                            format_text,
+                            template_name=template_name,
+                            template_description=template_desc or template_name
+                        )
+                        if not success:
+                            st.error(t("parse_failed", message=result))
+                            return
 
-                    result["rules"] = normalize_template_rules(result.get("rules", {}))
+                        result["rules"] = normalize_template_rules(result.get("rules", {}))
 
                     # 保存模板
-                    format_manager = FormatManager()
+                    format_manager = get_format_manager()
                     template_valid, template_error = format_manager.validate_template(result)
                     if not template_valid:
                         st.error(t("invalid_template_format", message=template_error))
                         return
+                    if cached_rules is None:
+                        response_cache.put(cache_key, result["rules"])
 
                     if format_manager.save_template(template_name, result):
                         st.success(t("template_created", name=template_name))
@@ -1378,17 +1454,12 @@ def page_text_parsing():
 # ========================
 def page_help():
     """帮助页面"""
-    st.markdown(f'<p class="main-header">{t("page_help")}</p>', unsafe_allow_html=True)
+    st.markdown(PAGE_HEADER_HTML.format(t("page_help")), unsafe_allow_html=True)
 
     st.markdown(t("help_markdown"))
 
     st.divider()
-    st.markdown("""
-    <div style="text-align: center; color: #666;">
-        FormulaAI Web v2.0.0 |
-        <a href="https://github.com/waterdrop26651/FormulaAI" target="_blank">GitHub</a>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(HELP_FOOTER_HTML, unsafe_allow_html=True)
 
 
 # ========================
@@ -1398,13 +1469,7 @@ def main():
     """主应用"""
     # 侧边栏导航
     with st.sidebar:
-        st.markdown("""
-        <div style="text-align: center; padding: 1rem 0;">
-            <div style="font-size: 3rem; margin-bottom: 0.5rem;">
-                <span style="color: #3b82f6;">F</span>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(SIDEBAR_LOGO_HTML, unsafe_allow_html=True)
         st.title("FormulaAI")
         st.caption(t("sidebar_tagline"))
 